@@ -0,0 +1,246 @@
+import json
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from classes.CaseStore import NotFoundError
+from classes.Map import Map
+from classes.TraceQuery import MAX_TIME_GAP, TraceQuery
+
+
+class BadRequestError(Exception):
+    """
+    Raised when a request parameter is missing or not valid.
+    """
+
+
+class AnalysisServer:
+    def __init__(self, store, proximity_distance, secured_areas, host="127.0.0.1", port=8000):
+        """
+        Local HTTP service answering analysis requests over the cases kept in a CaseStore.
+
+        The configuration is read once when the service starts and the cases stay
+        loaded between requests, so each request only runs the query itself.
+
+        Endpoints (all GET, optional `start` and `end` query parameters):
+            /cases                       Configured and loaded cases.
+            /cases/<id>/position?at=     Position of both entities at a given time (`max_gap`).
+            /cases/<id>/proximity        Encounters (`distance`, `max_gap`).
+            /cases/<id>/geofence         Aggressor fixes near the secured areas (`distance`).
+            /cases/<id>/map              HTML map fragment of the time window (`distance`, `max_gap`).
+
+        Args:
+            store (CaseStore): The store holding the cases.
+            proximity_distance (float): Default distance threshold in meters.
+            secured_areas (list): Secured areas used by the geofence and map requests.
+            host (str, optional): Interface to listen on. Defaults to "127.0.0.1".
+            port (int, optional): Port to listen on, 0 picks a free one. Defaults to 8000.
+        """
+        self.store = store
+        self.proximity_distance = proximity_distance
+        self.secured_areas = secured_areas
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def address(self):
+        """
+        Returns the (host, port) the service is listening on.
+        """
+        return self.httpd.server_address[:2]
+
+    def serve_forever(self):
+        """
+        Serves requests until the process is interrupted.
+        """
+        host, port = self.address
+        print(f"Servicio de análisis escuchando en http://{host}:{port}")
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.httpd.server_close()
+
+    def start(self):
+        """
+        Serves requests from a background thread and returns it.
+        """
+        thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self):
+        """
+        Stops serving requests and releases the socket.
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _handler(self):
+        """
+        Builds the request handler class bound to this service.
+        """
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                parts = [part for part in url.path.split("/") if part]
+                try:
+                    if parts == ["cases"]:
+                        body = json.dumps({"cases": sorted(service.store.cases), "loaded": service.store.loaded()})
+                        self._send(200, "application/json", body)
+                    elif len(parts) == 3 and parts[0] == "cases":
+                        case = service.store.get(parts[1])
+                        content_type, body = service.handle(parts[2], case, params)
+                        self._send(200, content_type, body)
+                    else:
+                        self._send_error(404, f"Ruta no encontrada: {url.path}")
+                except NotFoundError as e:
+                    self._send_error(404, str(e.args[0]))
+                except BadRequestError as e:
+                    self._send_error(400, str(e))
+                except OSError as e:
+                    self._send_error(500, f"Error al leer los datos del caso: {e}")
+                except Exception as e:
+                    self._send_error(500, f"Error interno: {type(e).__name__}: {e}")
+
+            def log_message(self, format, *args):
+                # Las peticiones del panel son continuas: no se registran en consola
+                pass
+
+            def _send(self, status, content_type, body):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_error(self, status, message):
+                self._send(status, "application/json", json.dumps({"error": message}))
+
+        return Handler
+
+    def handle(self, action, case, params):
+        """
+        Answers a request over a loaded case.
+
+        Args:
+            action (str): "position", "proximity", "geofence" or "map".
+            case (dict): The case returned by the CaseStore.
+            params (dict): The query string parameters.
+
+        Raises:
+            NotFoundError: If the action does not exist.
+            BadRequestError: If a parameter is missing or not valid.
+
+        Returns:
+            tuple[str, str]: The content type and the body of the response.
+        """
+        query = case["query"]
+        start, end = self._time(params, "start"), self._time(params, "end")
+        distance = self._number(params, "distance", self.proximity_distance)
+        max_gap = self._number(params, "max_gap", MAX_TIME_GAP)
+
+        if action == "position":
+            at = self._time(params, "at", required=True)
+            positions = {
+                entity: query.position_at(entity, at, max_gap)
+                for entity in (TraceQuery.AGGRESSOR, TraceQuery.VICTIM)
+            }
+            return "application/json", json.dumps(positions)
+        if action == "proximity":
+            return "application/json", query.encounters(start, end, distance, max_gap).to_json(orient="records")
+        if action == "geofence":
+            return "application/json", json.dumps(self.geofence(query, distance, start, end))
+        if action == "map":
+            return "text/html", self.map_fragment(query, distance, max_gap, start, end)
+        raise NotFoundError(f"Acción no válida: {action}")
+
+    @staticmethod
+    def _number(params, name, default):
+        """
+        Reads a non-negative number from the query string parameters.
+        """
+        if name not in params:
+            return default
+        try:
+            value = float(params[name])
+        except ValueError:
+            raise BadRequestError(f"El parámetro '{name}' debe ser un número: {params[name]}")
+        if not math.isfinite(value) or value < 0:
+            raise BadRequestError(f"El parámetro '{name}' debe ser un número no negativo: {params[name]}")
+        return value
+
+    @staticmethod
+    def _time(params, name, required=False):
+        """
+        Reads a timestamp from the query string parameters.
+        """
+        if name not in params:
+            if required:
+                raise BadRequestError(f"Falta el parámetro '{name}'")
+            return None
+        try:
+            value = pd.Timestamp(params[name])
+        except ValueError:
+            value = pd.NaT
+        if pd.isna(value):
+            raise BadRequestError(f"El parámetro '{name}' no es una fecha válida: {params[name]}")
+        return value
+
+    def geofence(self, query, distance, start=None, end=None):
+        """
+        Lists the aggressor fixes closer than `distance` meters to each secured area.
+        """
+        aggressor = query.time_slice(TraceQuery.AGGRESSOR)
+        result = []
+        for area in self.secured_areas:
+            lat, lng = area["coordinates"]
+            fixes = sorted(query.nearby(TraceQuery.AGGRESSOR, lat, lng, distance, start, end))
+            result.append({
+                "name": area["name"],
+                "fixes": [
+                    {"time": aggressor["time"].iloc[index], "location": aggressor["location"].iloc[index], "distance": meters}
+                    for index, meters in fixes
+                ],
+            })
+        return result
+
+    def map_fragment(self, query, distance, max_gap, start=None, end=None):
+        """
+        Renders the map of a time window: fixes of both entities, their routes,
+        the secured areas and a proximity circle for every encounter.
+        """
+        victim = query.time_slice(TraceQuery.VICTIM, start, end)
+        aggressor = query.time_slice(TraceQuery.AGGRESSOR, start, end)
+        reference = victim if not victim.empty else aggressor
+        if reference.empty:
+            raise BadRequestError("No hay fijaciones en la ventana indicada")
+
+        map_instance = Map(Map.verify_location(reference["location"].iloc[0]))
+        for area in self.secured_areas:
+            map_instance.add_safe_zone(area, distance)
+
+        for data, entity_type, color, icon in (
+            (aggressor, "Agresor", "red", "male"),
+            (victim, "Víctima", "green", "female"),
+        ):
+            positions = []
+            for position, (_, row) in enumerate(data.iterrows()):
+                lat, lng = Map.verify_location(row["location"])
+                map_instance.process_entity(lat, lng, position, row, entity_type, color, icon)
+                positions.append((lat, lng))
+            map_instance.add_entity_route(positions, color, entity_type)
+
+        for encounter in query.encounters(start, end, distance, max_gap).itertuples():
+            map_instance.add_proximity_circle(
+                encounter.victim_location, distance, "orange", f"Proximity Alert: {encounter.distance:.2f}m"
+            )
+        return map_instance.render()
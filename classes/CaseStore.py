@@ -0,0 +1,119 @@
+import os
+import threading
+from collections import OrderedDict
+
+from classes.FileSystem import FileSystem
+from classes.TraceQuery import TraceQuery
+
+
+class NotFoundError(KeyError):
+    """
+    Raised when a requested case or action does not exist.
+    """
+
+
+class CaseStore:
+    def __init__(self, cases, max_cases=8, valid_precision=None):
+        """
+        Keeps the traces and indexes of the most recently used cases in memory.
+
+        Cases are loaded lazily on first access and evicted in least-recently-used
+        order once more than `max_cases` are loaded. Every access compares the size
+        and modification time of the case files with the ones seen at load time, so
+        a case is reloaded as soon as any of its files changes on disk. Loading
+        happens outside the store-wide lock, under a lock of its own case, so a
+        slow load never delays the requests for the other cases.
+
+        Args:
+            cases (dict): Case id mapped to a dict with the "aggressor" and "victim"
+                paths (CSV file, directory or glob pattern).
+            max_cases (int, optional): Maximum number of cases kept in memory. Defaults to 8.
+            valid_precision (float, optional): Precision threshold. If None, it is read
+                from the configuration.
+        """
+        self.cases = cases
+        self.max_cases = max_cases
+        self.valid_precision = valid_precision
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+        self._case_locks = {}
+
+    def get(self, case_id):
+        """
+        Returns a loaded case, loading or reloading it if needed.
+
+        Args:
+            case_id (str): The id of the case.
+
+        Raises:
+            NotFoundError: If the case is not configured.
+
+        Returns:
+            dict: The case with its "aggressor" and "victim" DataFrames, the "query"
+                (TraceQuery) built over them and the "signature" of its files.
+        """
+        if case_id not in self.cases:
+            raise NotFoundError(f"Caso no configurado: {case_id}")
+
+        signature = self._signature(self.cases[case_id])
+        with self._lock:
+            case = self._cached(case_id, signature)
+            if case is not None:
+                return case
+            case_lock = self._case_locks.setdefault(case_id, threading.Lock())
+
+        with case_lock:
+            # Otra petición puede haberlo cargado mientras esperábamos
+            with self._lock:
+                case = self._cached(case_id, signature)
+            if case is None:
+                case = self._load(self.cases[case_id], signature)
+                with self._lock:
+                    self._loaded[case_id] = case
+                    self._loaded.move_to_end(case_id)
+                    while len(self._loaded) > self.max_cases:
+                        self._loaded.popitem(last=False)
+        return case
+
+    def _cached(self, case_id, signature):
+        """
+        Returns the loaded case if it is still up to date, marking it as recently used.
+        Must be called holding the store lock.
+        """
+        case = self._loaded.get(case_id)
+        if case is None or case["signature"] != signature:
+            return None
+        self._loaded.move_to_end(case_id)
+        return case
+
+    def loaded(self):
+        """
+        Returns the ids of the cases currently in memory, least recently used first.
+        """
+        with self._lock:
+            return list(self._loaded)
+
+    @staticmethod
+    def _signature(paths):
+        """
+        Identifies the current version of the files of a case by their size and modification time.
+        """
+        signature = []
+        for entity in ("aggressor", "victim"):
+            for csv_file in FileSystem.get_csv_files(paths[entity]):
+                stat = os.stat(csv_file)
+                signature.append((csv_file, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _load(self, paths, signature):
+        """
+        Reads the traces of a case and builds its query indexes.
+        """
+        aggressor_data = FileSystem.read_dataset(paths["aggressor"], valid_precision=self.valid_precision)
+        victim_data = FileSystem.read_dataset(paths["victim"], valid_precision=self.valid_precision)
+        return {
+            "aggressor": aggressor_data,
+            "victim": victim_data,
+            "query": TraceQuery(victim_data, aggressor_data),
+            "signature": signature,
+        }
@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+
+from src.distance import haversine_distance, initial_bearing, prepare_track
+
+
+class CoMovement:
+    def __init__(self, victim_data, aggressor_data, step=60, max_gap=600):
+        """
+        Aligns the victim and aggressor tracks on a common time grid.
+
+        Both tracks are linearly interpolated every `step` seconds over the period
+        they have in common. Grid points that fall between two fixes more than
+        `max_gap` seconds apart are left empty (NaN), so long silences of a tracker
+        are never filled with invented positions. For every grid point the distance
+        between both entities, and the speed and heading of each one since the
+        previous grid point, are computed with vectorized numpy operations.
+
+        Args:
+            victim_data (pandas.DataFrame): Victim fixes with "time" and "location" columns.
+            aggressor_data (pandas.DataFrame): Aggressor fixes with "time" and "location" columns.
+            step (float, optional): Seconds between grid points. Defaults to 60.
+            max_gap (float, optional): Maximum seconds between two fixes to interpolate
+                between them. Defaults to 600.
+        """
+        self.step = step
+        self.max_gap = max_gap
+
+        victim = prepare_track(victim_data)
+        aggressor = prepare_track(aggressor_data)
+
+        if len(victim["times"]) and len(aggressor["times"]):
+            first = max(victim["times"][0], aggressor["times"][0])
+            last = min(victim["times"][-1], aggressor["times"][-1])
+            grid = np.arange(np.ceil(first / step) * step, last + step / 2, step)
+            grid = grid[grid <= last]
+        else:
+            grid = np.array([], dtype=float)
+
+        v_lat, v_lng = self._resample(grid, victim["times"], victim["lats"], victim["lngs"])
+        a_lat, a_lng = self._resample(grid, aggressor["times"], aggressor["lats"], aggressor["lngs"])
+
+        self.aligned = pd.DataFrame({
+            "time": pd.to_datetime(grid, unit="s"),
+            "victim_lat": v_lat,
+            "victim_lng": v_lng,
+            "aggressor_lat": a_lat,
+            "aggressor_lng": a_lng,
+            "distance": haversine_distance(v_lat, v_lng, a_lat, a_lng),
+            "victim_speed": self._speed(v_lat, v_lng),
+            "aggressor_speed": self._speed(a_lat, a_lng),
+            "victim_heading": self._heading(v_lat, v_lng),
+            "aggressor_heading": self._heading(a_lat, a_lng),
+        })
+
+    def _resample(self, grid, times, lats, lngs):
+        """
+        Interpolates a track on the grid, leaving NaN where the surrounding fixes are too far apart.
+        """
+        if not len(grid):
+            return np.array([], dtype=float), np.array([], dtype=float)
+
+        after = np.clip(np.searchsorted(times, grid, side="left"), 0, len(times) - 1)
+        before = np.clip(np.searchsorted(times, grid, side="right") - 1, 0, len(times) - 1)
+        covered = times[after] - times[before] <= self.max_gap
+
+        lat = np.where(covered, np.interp(grid, times, lats), np.nan)
+        lng = np.where(covered, np.interp(grid, times, lngs), np.nan)
+        return lat, lng
+
+    def _speed(self, lats, lngs):
+        """
+        Speed in m/s between consecutive grid points (NaN for the first one).
+        """
+        meters = haversine_distance(lats[:-1], lngs[:-1], lats[1:], lngs[1:])
+        return np.concatenate([[np.nan], meters / self.step])[:len(lats)]
+
+    @staticmethod
+    def _heading(lats, lngs):
+        """
+        Heading in degrees between consecutive grid points (NaN for the first one).
+        """
+        return np.concatenate([[np.nan], initial_bearing(lats[:-1], lngs[:-1], lats[1:], lngs[1:])])[:len(lats)]
+
+    def detect(self, max_distance=200, window=10, max_heading_diff=45, min_speed=0.5,
+               min_speed_ratio=0.5, min_duration=600):
+        """
+        Flags the segments where the aggressor moves together with the victim.
+
+        A window of `window` consecutive grid points is a co-movement window when,
+        on average over the window, both entities are closer than `max_distance`,
+        the victim is moving, both headings agree and both speeds are similar.
+        Rolling means are computed with pandas in linear time, and any empty grid
+        point inside a window invalidates it. Grid points covered by co-movement
+        windows are merged into segments, and only segments lasting at least
+        `min_duration` seconds are returned.
+
+        Args:
+            max_distance (float, optional): Maximum mean distance in meters. Defaults to 200.
+            window (int, optional): Number of grid points per window. Defaults to 10.
+            max_heading_diff (float, optional): Maximum mean heading difference in degrees. Defaults to 45.
+            min_speed (float, optional): Minimum mean victim speed in m/s. Defaults to 0.5.
+            min_speed_ratio (float, optional): Minimum ratio between the slower and the faster
+                mean speed. Defaults to 0.5.
+            min_duration (float, optional): Minimum segment duration in seconds. Defaults to 600.
+
+        Returns:
+            pandas.DataFrame: One row per segment with its "start", "end", "duration"
+                (seconds), "mean_distance", "heading_similarity" (mean cosine of the heading
+                difference) and "speed_similarity" (slower / faster mean speed).
+        """
+        aligned = self.aligned
+        columns = ["start", "end", "duration", "mean_distance", "heading_similarity", "speed_similarity"]
+        if len(aligned) < window:
+            return pd.DataFrame(columns=columns)
+
+        heading_cos = np.cos(np.radians(aligned["victim_heading"] - aligned["aggressor_heading"]))
+        rolling = pd.DataFrame({
+            "distance": aligned["distance"],
+            "heading": heading_cos,
+            "victim_speed": aligned["victim_speed"],
+            "aggressor_speed": aligned["aggressor_speed"],
+        }).rolling(window, min_periods=window).mean()
+
+        speeds = rolling[["victim_speed", "aggressor_speed"]]
+        speed_ratio = speeds.min(axis=1) / speeds.max(axis=1)
+        flags = (
+            (rolling["distance"] <= max_distance)
+            & (rolling["victim_speed"] >= min_speed)
+            & (rolling["heading"] >= np.cos(np.radians(max_heading_diff)))
+            & (speed_ratio >= min_speed_ratio)
+        ).to_numpy()
+
+        # Un punto pertenece a un segmento si alguna ventana marcada lo contiene:
+        # la ventana que termina en e cubre los puntos [e - window + 1, e].
+        flagged = np.concatenate([[0], np.cumsum(flags)])
+        ends = np.minimum(np.arange(len(flags)) + window, len(flags))
+        covered = flagged[ends] - flagged[np.arange(len(flags))] > 0
+
+        starts = covered & ~np.concatenate([[False], covered[:-1]])
+        points = aligned[covered].assign(
+            segment=np.cumsum(starts)[covered],
+            heading=heading_cos[covered],
+        )
+        segments = points.groupby("segment").agg(
+            start=("time", "first"),
+            end=("time", "last"),
+            mean_distance=("distance", "mean"),
+            heading_similarity=("heading", "mean"),
+            victim_speed=("victim_speed", "mean"),
+            aggressor_speed=("aggressor_speed", "mean"),
+        )
+        segments["duration"] = (segments["end"] - segments["start"]).dt.total_seconds()
+        segments["speed_similarity"] = (
+            segments[["victim_speed", "aggressor_speed"]].min(axis=1)
+            / segments[["victim_speed", "aggressor_speed"]].max(axis=1)
+        )
+        segments = segments[segments["duration"] >= min_duration]
+        return segments[columns].reset_index(drop=True)
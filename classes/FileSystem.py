@@ -1,6 +1,10 @@
+import glob
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
-import json
 
 
 class FileSystem:
@@ -56,7 +60,67 @@ class FileSystem:
             raise FileNotFoundError(f"No se encontró la ruta especificada: {data_path}")
 
     @staticmethod
-    def read_data(csv_file):
+    def get_csv_files(data_path):
+        """
+            Retrieves every CSV file that makes up a single logical trace.
+
+            The path may point to one CSV file, to a directory (all the CSV files it
+            contains are used) or be a glob pattern such as "data/agresor/*.csv".
+            Files are returned sorted by name so the result is deterministic.
+
+            Raises:
+                ValueError: If the provided file is not a CSV or if no CSV file matches.
+                FileNotFoundError: If the provided path does not exist.
+
+            Args:
+                data_path: Path to a file, directory or glob pattern.
+
+            Returns:
+                list[str]: Paths to the located CSV files.
+        """
+        if os.path.isfile(data_path):
+            return [FileSystem.get_csv_file(data_path)]
+        elif os.path.isdir(data_path):
+            csv_files = [os.path.join(data_path, f) for f in os.listdir(data_path) if f.endswith(".csv")]
+        elif glob.has_magic(data_path):
+            csv_files = [f for f in glob.glob(data_path) if f.endswith(".csv") and os.path.isfile(f)]
+        else:
+            raise FileNotFoundError(f"No se encontró la ruta especificada: {data_path}")
+
+        if not csv_files:
+            raise ValueError(f"No se encontraron archivos CSV en '{data_path}'.")
+        return sorted(csv_files)
+
+    @staticmethod
+    def get_time_bounds(csv_file, time_column="time"):
+        """
+        Reads the time range covered by a CSV file.
+
+        Only the time column is parsed, and the minimum and maximum timestamps are
+        taken, so the bounds are right even if the fixes are not in chronological order.
+
+        Parameters:
+        csv_file: str
+            Path to the CSV file.
+        time_column: str
+            Name of the column holding the timestamps.
+
+        Returns:
+        tuple[pandas.Timestamp, pandas.Timestamp] | None
+            The (first, last) timestamps, or None if the file has no time column or
+            none of its timestamps can be parsed.
+        """
+        try:
+            times = pd.read_csv(csv_file, usecols=[time_column])[time_column]
+        except ValueError:
+            return None
+        times = pd.to_datetime(times, errors="coerce").dropna()
+        if times.empty:
+            return None
+        return times.min(), times.max()
+
+    @staticmethod
+    def read_data(csv_file, valid_precision=None):
         """
         Reads data from a specified CSV file, filters rows based on a precision
         threshold, and returns the filtered DataFrame.
@@ -64,13 +128,16 @@ class FileSystem:
         Parameters:
         csv_file: str
             Path to the CSV file to be read.
+        valid_precision: float, optional
+            Precision threshold. If None, it is read from the configuration.
 
         Returns:
         pandas.DataFrame
             A DataFrame containing rows from the CSV file filtered based on the
             precision threshold.
         """
-        _, _, valid_precision = FileSystem.load_configuration()
+        if valid_precision is None:
+            _, _, valid_precision = FileSystem.load_configuration()
         df = pd.read_csv(csv_file)
 
         if 'valid' not in df.columns:
@@ -78,6 +145,144 @@ class FileSystem:
 
         return df[df['precision'] <= valid_precision]
 
+    @staticmethod
+    def read_dataset(data_path, start=None, end=None, valid_precision=None, max_workers=None):
+        """
+        Reads every CSV file of a trace and merges them into one DataFrame ordered by time.
+
+        The files are read in parallel and filtered by precision one by one. Each
+        file is sorted on its own and only the time keys of the sorted runs are merged
+        (a stable sort of already sorted runs is a k-way merge). The rows are then
+        copied column by column from the per-file frames straight to their merged
+        position, so the files are never concatenated up front. A single file is just
+        read and sorted. When a time range is given, files whose time column falls
+        outside of it are skipped without being fully read.
+
+        Parameters:
+        data_path: str
+            Path to a CSV file, a directory of CSV files or a glob pattern.
+        start: str | pandas.Timestamp, optional
+            Lower bound (inclusive) of the time range to load.
+        end: str | pandas.Timestamp, optional
+            Upper bound (inclusive) of the time range to load.
+        valid_precision: float, optional
+            Precision threshold. If None, it is read from the configuration.
+        max_workers: int, optional
+            Maximum number of threads used to read the files.
+
+        Raises:
+        ValueError
+            If the range bounds and the times of the files do not agree on having a time zone.
+
+        Returns:
+        pandas.DataFrame
+            The rows of all the files, filtered and ordered by the "time" column.
+            If no file falls inside the time range, an empty DataFrame with the
+            columns of the CSV files.
+        """
+        all_files = FileSystem.get_csv_files(data_path)
+        if valid_precision is None:
+            _, _, valid_precision = FileSystem.load_configuration()
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+
+        csv_files = all_files
+        if start is not None or end is not None:
+            csv_files = [f for f in all_files if FileSystem._overlaps(f, start, end)]
+
+        if not csv_files:
+            return FileSystem._empty_frame(all_files[0])
+        if len(csv_files) == 1:
+            df, _ = FileSystem._read_sorted(csv_files[0], start, end, valid_precision)
+            return df.reset_index(drop=True)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            runs = list(executor.map(
+                lambda f: FileSystem._read_sorted(f, start, end, valid_precision), csv_files
+            ))
+
+        columns = list(runs[0][0].columns)
+        frames = [df if list(df.columns) == columns else df.reindex(columns=columns) for df, _ in runs]
+        keys = np.concatenate([times for _, times in runs])
+        # Las claves ya vienen ordenadas por fichero: el ordenamiento estable las fusiona
+        order = np.argsort(keys, kind="stable")
+
+        # Posición final de cada fila, indexada por (fichero, fila) a través del desplazamiento del fichero
+        destination = np.empty(len(order), dtype=np.int64)
+        destination[order] = np.arange(len(order))
+        offsets = np.cumsum([0] + [len(df) for df in frames])
+
+        merged = {}
+        for column in columns:
+            values = [df[column].to_numpy() for df in frames]
+            try:
+                dtype = np.result_type(*values)
+            except TypeError:
+                dtype = object
+            merged[column] = np.empty(len(order), dtype=dtype)
+            for index, part in enumerate(values):
+                merged[column][destination[offsets[index]:offsets[index + 1]]] = part
+        return pd.DataFrame(merged, columns=columns, copy=False)
+
+    @staticmethod
+    def _empty_frame(csv_file):
+        """
+        Returns an empty DataFrame with the columns that read_data would give for a CSV file.
+        """
+        df = pd.read_csv(csv_file, nrows=0)
+        if 'valid' not in df.columns:
+            df['valid'] = 0
+        return df
+
+    @staticmethod
+    def _overlaps(csv_file, start, end):
+        """
+        Checks whether a CSV file may contain fixes inside the [start, end] range.
+        Files whose bounds cannot be read are kept.
+        """
+        bounds = FileSystem.get_time_bounds(csv_file)
+        if bounds is None:
+            return True
+        first, last = bounds
+        FileSystem._check_time_zone(first.tz, start, end)
+        return (start is None or last >= start) and (end is None or first <= end)
+
+    @staticmethod
+    def _check_time_zone(tz, start, end):
+        """
+        Raises ValueError if the range bounds and the times of a file do not agree on
+        having a time zone, since naive and aware timestamps cannot be compared.
+        """
+        for bound in (start, end):
+            if bound is not None and (bound.tz is None) != (tz is None):
+                raise ValueError(
+                    "El rango temporal y las horas de los ficheros deben tener zona horaria "
+                    f"ambos o ninguno (rango: {bound}, zona de los ficheros: {tz})."
+                )
+
+    @staticmethod
+    def _read_sorted(csv_file, start, end, valid_precision):
+        """
+        Reads a single CSV file, keeps the rows inside the time range and sorts them by time.
+        Returns the DataFrame and its times as int64 nanoseconds, both in the same order.
+        """
+        df = FileSystem.read_data(csv_file, valid_precision)
+        times = pd.to_datetime(df["time"])
+        FileSystem._check_time_zone(times.dt.tz, start, end)
+        mask = np.ones(len(df), dtype=bool)
+        if start is not None:
+            mask &= (times >= start).to_numpy()
+        if end is not None:
+            mask &= (times <= end).to_numpy()
+        if not mask.all():
+            df, times = df[mask], times[mask]
+
+        keys = times.to_numpy(dtype="datetime64[ns]").astype("int64")
+        if (np.diff(keys) >= 0).all():
+            return df, keys
+        order = np.argsort(keys, kind="stable")
+        return df.take(order), keys[order]
+
     @staticmethod
     def create_directories(directories):
         """
@@ -148,6 +353,68 @@ class FileSystem:
 
         return proximity_distance, secured_areas, valid_precision
 
+    @staticmethod
+    def load_cases():
+        """
+        Load the cases served by the analysis service from the JSON configuration file.
+
+        Each case maps an id to the "aggressor" and "victim" data paths (CSV file,
+        directory or glob pattern).
+
+        Raises
+        ------
+        ValueError
+            If the configuration file cannot be loaded or a case lacks one of the paths.
+
+        Returns
+        -------
+        dict
+            Case id mapped to a dict with the "aggressor" and "victim" paths.
+        """
+        try:
+            with open("config.json", "r") as file:
+                cases = json.load(file).get("cases", {})
+
+            for case_id, paths in cases.items():
+                if "aggressor" not in paths or "victim" not in paths:
+                    raise ValueError(f"El caso '{case_id}' debe indicar 'aggressor' y 'victim'")
+
+        except (TypeError, AttributeError, json.JSONDecodeError, FileNotFoundError) as e:
+            raise ValueError(f"Error al cargar los casos: {e}")
+
+        return cases
+
+    @staticmethod
+    def load_distance_cache():
+        """
+        Load the settings of the distance cache from the JSON configuration file.
+
+        Raises
+        ------
+        ValueError
+            If the configuration file cannot be loaded or the values are not valid.
+
+        Returns
+        -------
+        dict
+            The "resolution" (degrees, or None for exact coordinates) and "maxsize"
+            (number of entries) of the cache.
+        """
+        try:
+            with open("config.json", "r") as file:
+                settings = json.load(file).get("distance_cache", {})
+
+            resolution = settings.get("resolution", 1e-6)
+            cache = {
+                "resolution": float(resolution) if resolution is not None else None,
+                "maxsize": int(settings.get("maxsize", 65536)),
+            }
+
+        except (TypeError, ValueError, AttributeError, json.JSONDecodeError, FileNotFoundError) as e:
+            raise ValueError(f"Error al cargar la configuración de la caché de distancias: {e}")
+
+        return cache
+
     def get_directories(self):
         """
         Retrieves the 'data' and 'result' directories based on the base directory.
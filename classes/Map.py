@@ -1,18 +1,36 @@
 import folium
+import math
 import os
-from src.distance import calculate_distance, extract_coordinates
+import numpy as np
+import pandas as pd
+from folium.plugins import TimestampedGeoJson
+from src.distance import calculate_distance, extract_coordinates, prepare_track
+from src.utils import to_epoch_seconds
+
+# Grados de longitud por píxel con zoom 0 (teselas de 256 px en Web Mercator)
+DEGREES_PER_PIXEL_ZOOM_0 = 360 / 256
+# Desplazamiento mínimo en píxeles para que una fijación genere un nuevo fotograma
+PLAYBACK_MIN_PIXELS = 3
 
 
 class Map:
-    def __init__(self, center, zoom_start=15):
+    def __init__(self, center, zoom_start=15, playback_period=60, playback_max_frames=500):
         """
         Initialize a Map object using the Folium library. The map is centered on the given coordinates with an initial zoom level.
 
         Args:
             center (tuple[float, float]): Latitude and longitude values representing the center of the map.
             zoom_start (int, optional): The initial zoom level for the map. Defaults to 15.
+            playback_period (float, optional): Seconds between frames of the playback layer. Defaults to 60.
+            playback_max_frames (int, optional): Maximum number of frames of the playback layer;
+                the period is widened when the replay would need more. Defaults to 500.
         """
         self.map = folium.Map(location=center, zoom_start=zoom_start, tiles="Cartodb Positron")
+        self.zoom_start = zoom_start
+        self.playback_period = playback_period
+        self.playback_max_frames = playback_max_frames
+        self.playback_entities = []
+        self.playback_episodes = []
 
     def add_safe_zone(self, secured_area, proximity_distance):
         """
@@ -112,13 +130,146 @@ class Map:
             ).add_to(self.map)
 
 
+    def add_playback(self, entity_data, entity_type, color):
+        """
+        Registers the fixes of an entity for the time-slider playback layer.
+
+        The frames are not built here but when the map is saved or rendered, once
+        every entity and episode has been registered.
+
+        Args:
+            entity_data (pandas.DataFrame): Fixes with "time" and "location" columns.
+            entity_type (str): A string indicating the type of entity (e.g., "Agresor" or "Víctima").
+            color (str): The color of the entity in the playback.
+        """
+        self.playback_entities.append((entity_data, entity_type, color))
+
+    def add_playback_episodes(self, victim_data, episodes, color="orange"):
+        """
+        Registers alert episodes for the time-slider playback layer.
+
+        The victim fixes inside each episode appear on the playback as alert points
+        at their own time.
+
+        Args:
+            victim_data (pandas.DataFrame): Victim fixes with "time" and "location" columns.
+            episodes (pandas.DataFrame): Episodes with "start" and "end" columns, such as
+                the ones returned by ProximitySweep.episodes.
+            color (str, optional): The color of the alert points. Defaults to "orange".
+        """
+        times = to_epoch_seconds(pd.to_datetime(victim_data["time"], errors="coerce"))
+        in_episode = np.zeros(len(victim_data), dtype=bool)
+        for start, end in zip(to_epoch_seconds(episodes["start"]), to_epoch_seconds(episodes["end"])):
+            in_episode |= (times >= start) & (times <= end)
+        self.playback_episodes.append((victim_data[in_episode], color))
+
+    def _downsample(self, times, lats, lngs, period):
+        """
+        Reduces a track to the fixes that change the playback: the last fix of every
+        period, and among those only the ones that move at least PLAYBACK_MIN_PIXELS
+        pixels at the initial zoom of the map. The first and last fixes are always kept.
+
+        Returns:
+            numpy.ndarray: The indices of the kept fixes, in time order.
+        """
+        if len(times) <= 2:
+            return np.arange(len(times))
+
+        # Última fijación de cada periodo
+        buckets = np.floor(times / period)
+        keep = np.flatnonzero(np.append(buckets[1:] != buckets[:-1], True))
+
+        # Rejilla con el tamaño de PLAYBACK_MIN_PIXELS píxeles al zoom inicial. En Web
+        # Mercator un píxel abarca siempre los mismos grados de longitud, y en latitud
+        # esos grados multiplicados por el coseno de la latitud.
+        cell_lng = PLAYBACK_MIN_PIXELS * DEGREES_PER_PIXEL_ZOOM_0 / 2 ** self.zoom_start
+        cell_lat = cell_lng * math.cos(math.radians(float(np.mean(lats[keep]))))
+        rows = np.floor(lats[keep] / cell_lat)
+        cols = np.floor(lngs[keep] / cell_lng)
+        moved = np.concatenate([[True], (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])])
+        keep = keep[moved]
+
+        if keep[0] != 0:
+            keep = np.concatenate([[0], keep])
+        if keep[-1] != len(times) - 1:
+            keep = np.append(keep, len(times) - 1)
+        return keep
+
+    @staticmethod
+    def _iso_times(times):
+        """
+        Formats epoch seconds as the ISO 8601 strings expected by TimestampedGeoJson.
+        """
+        return pd.to_datetime(times, unit="s").strftime("%Y-%m-%dT%H:%M:%S").tolist()
+
+    def _add_playback_layer(self):
+        """
+        Builds the frames of the registered entities and episodes and adds them to
+        the map as a TimestampedGeoJson layer. Each entity becomes one LineString
+        whose vertices are its downsampled fixes, and each alert a Point.
+        """
+        if not self.playback_entities and not self.playback_episodes:
+            return
+
+        tracks = [(prepare_track(data), entity_type, color) for data, entity_type, color in self.playback_entities]
+        alerts = [(prepare_track(data), color) for data, color in self.playback_episodes]
+
+        all_times = np.concatenate([track["times"] for track, *_ in tracks + alerts] or [np.array([])])
+        if not len(all_times):
+            return
+        span = float(all_times.max() - all_times.min())
+        period = max(self.playback_period, math.ceil(span / self.playback_max_frames))
+
+        features = []
+        for track, entity_type, color in tracks:
+            times, lats, lngs = track["times"], track["lats"], track["lngs"]
+            if not len(times):
+                continue
+            keep = self._downsample(times, lats, lngs, period)
+            features.append({
+                "type": "Feature",
+                "geometry": {"type": "LineString", "coordinates": np.column_stack([lngs[keep], lats[keep]]).tolist()},
+                "properties": {
+                    "times": self._iso_times(times[keep]),
+                    "popup": entity_type,
+                    "style": {"color": color, "weight": 2.5},
+                    "icon": "circle",
+                    "iconstyle": {"color": color, "fillColor": color, "fillOpacity": 0.8, "radius": 6},
+                },
+            })
+        for track, color in alerts:
+            times, lats, lngs, rows = track["times"], track["lats"], track["lngs"], track["data"]
+            keep = self._downsample(times, lats, lngs, period)
+            for index, time in zip(keep, self._iso_times(times[keep])):
+                features.append({
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": [float(lngs[index]), float(lats[index])]},
+                    "properties": {
+                        "time": time,
+                        "popup": f"Proximity Alert: {rows['time'].iloc[index]}",
+                        "icon": "circle",
+                        "iconstyle": {"color": color, "fillColor": color, "fillOpacity": 0.6, "radius": 10},
+                    },
+                })
+
+        TimestampedGeoJson(
+            {"type": "FeatureCollection", "features": features},
+            period=f"PT{int(period)}S",
+            add_last_point=True,
+            date_options="YYYY-MM-DD HH:mm:ss",
+        ).add_to(self.map)
+        self.playback_entities = []
+        self.playback_episodes = []
+
     def save(self, result_folder, output_file):
         """
         Saves the current map instance to a specified folder and file.
 
         This function ensures the target directory exists. If it does not,
-        the directory is created. Then the map instance linked to the 'self.map'
-        attribute is saved at the specified location using the output file name.
+        the directory is created. The frames of the playback layer, if any entity
+        was registered with `add_playback`, are built and added to the map. Then the
+        map instance linked to the 'self.map' attribute is saved at the specified
+        location using the output file name.
         Finally, a success message is printed to confirm the operation.
 
         Parameters:
@@ -133,9 +284,23 @@ class Map:
         None
         """
         os.makedirs(result_folder, exist_ok=True)
+        self._add_playback_layer()
         self.map.save(os.path.join(result_folder, output_file))
         print(f"Mapa generado exitosamente: {os.path.join(result_folder, output_file)}")
 
+    def render(self):
+        """
+        Renders the current map instance as a standalone HTML document.
+
+        Unlike `save`, nothing is written to disk, so the result can be served
+        directly or embedded in another page.
+
+        Returns:
+            str: The HTML of the map.
+        """
+        self._add_playback_layer()
+        return self.map.get_root().render()
+
     @staticmethod
     def verify_location(location):
         """
@@ -310,6 +475,45 @@ class Map:
         final_color = color if is_valid else "gray"
         self.add_marker((lat, lng), tooltip_text, final_color, icon)
 
+    @classmethod
+    def from_alerts(cls, aggressor, victim, alerts, center=None):
+        """
+        Creates a map with every aggressor fix, the alerting victim fixes and the routes of both.
+
+        Args:
+            aggressor (dict): Aggressor track as returned by `prepare_track`.
+            victim (dict): Victim track as returned by `prepare_track`.
+            alerts (list[tuple]): One (index, row, radius, color, tooltip) tuple per alerting
+                victim fix: its index in the victim track, the row shown in its tooltip and
+                the radius, color and tooltip of its proximity circle.
+            center (tuple[float, float], optional): Center of the map. Defaults to the
+                first aggressor fix.
+
+        Returns:
+            Map: The map with the markers, routes and proximity circles.
+        """
+        aggressor_positions = list(zip(aggressor["lats"].tolist(), aggressor["lngs"].tolist()))
+        if center is None:
+            center = aggressor_positions[0] if aggressor_positions else (0, 0)
+        map_instance = cls(center)
+
+        position = 0
+        for (lat, lng), (_, row) in zip(aggressor_positions, aggressor["data"].iterrows()):
+            map_instance.process_entity(lat, lng, position, row, "Agresor", "red", "male")
+            position += 1
+
+        victim_positions = []
+        for index, row, radius, color, tooltip in alerts:
+            lat, lng = float(victim["lats"][index]), float(victim["lngs"][index])
+            map_instance.process_entity(lat, lng, position, row, "Víctima", "green", "female")
+            map_instance.add_proximity_circle((lat, lng), radius, color, tooltip)
+            victim_positions.append((lat, lng))
+            position += 1
+
+        map_instance.add_entity_route(aggressor_positions, "red", "Agresor")
+        map_instance.add_entity_route(victim_positions, "green", "Víctima")
+        return map_instance
+
     @staticmethod
     def get_coordinates(data_row, location_column):
         """
@@ -0,0 +1,171 @@
+import numpy as np
+
+from classes.Map import Map
+from src.distance import HAVERSINE_MARGIN, calculate_distance, candidate_pairs, haversine_distance, prepare_track
+
+
+class PrecisionProximity:
+    CERTAINLY_NEAR = "certainly_near"
+    POSSIBLY_NEAR = "possibly_near"
+    CERTAINLY_FAR = "certainly_far"
+
+    def __init__(self, victim_data, aggressor_data, proximity_distance, max_time_gap=None, block_size=1 << 20):
+        """
+        Classifies victim/aggressor pairs taking the precision of each fix into account.
+
+        The `precision` of a fix is its accuracy radius in meters, so the real distance
+        between two fixes lies within the measured distance plus or minus the sum of
+        both precisions. A pair is certainly near when even the upper bound is within
+        `proximity_distance`, certainly far when even the lower bound is beyond it, and
+        possibly near otherwise. Fixes without precision are taken as exact.
+
+        The pairs given by `candidate_pairs` are first bounded in bulk with the
+        haversine estimate widened by HAVERSINE_MARGIN, and only the pairs those
+        bounds cannot classify are evaluated with `calculate_distance`. The reported
+        `distance` of a victim fix is the geodesic distance of the pair that decided its
+        status: its closest certainly near pair, else its closest possibly near pair,
+        else its closest pair.
+
+        Args:
+            victim_data (pandas.DataFrame): Victim fixes with "time", "precision" and "location" columns.
+            aggressor_data (pandas.DataFrame): Aggressor fixes with "time", "precision" and "location" columns.
+            proximity_distance (float): Distance threshold in meters.
+            max_time_gap (float, optional): Only aggressor fixes at most this many seconds
+                away from the victim fix are considered. Defaults to None (any time).
+            block_size (int, optional): Maximum pairs compared at once. Defaults to 1048576.
+        """
+        self.proximity_distance = proximity_distance
+        self.max_time_gap = max_time_gap
+        self.victim = prepare_track(victim_data, require_time=False)
+        self.aggressor = prepare_track(aggressor_data, require_time=False)
+        self.stats = {"pairs": 0, "pruned_far": 0, "pruned_near": 0, "exact": 0}
+        self.results = self._classify(block_size)
+
+    def _classify(self, block_size):
+        """
+        Classifies every victim fix by its best pair with an aggressor fix.
+        """
+        victim, aggressor = self.victim, self.aggressor
+        threshold = self.proximity_distance
+        count = len(victim["lats"])
+        certain = np.zeros(count, dtype=int)
+        possible = np.zeros(count, dtype=int)
+        # Par más cercano (según la haversine) de cada fijación entre sus pares cercanos, posibles y todos
+        nearest = {kind: (np.full(count, np.inf), np.full(count, -1)) for kind in ("near", "possible", "any")}
+
+        for rows, cols in candidate_pairs(victim["times"], aggressor["times"], self.max_time_gap, block_size):
+            estimate = haversine_distance(
+                victim["lats"][rows], victim["lngs"][rows], aggressor["lats"][cols], aggressor["lngs"][cols]
+            )
+            combined = victim["precision"][rows] + aggressor["precision"][cols]
+            far = estimate * (1 - HAVERSINE_MARGIN) - combined > threshold
+            near = estimate * (1 + HAVERSINE_MARGIN) + combined <= threshold
+            undecided = np.flatnonzero(~far & ~near)
+
+            # Solo los pares que las cotas no deciden se calculan con la distancia geodésica
+            exact = np.array([
+                calculate_distance(
+                    (float(victim["lats"][i]), float(victim["lngs"][i])),
+                    (float(aggressor["lats"][j]), float(aggressor["lngs"][j])),
+                )
+                for i, j in zip(rows[undecided].tolist(), cols[undecided].tolist())
+            ], dtype=float)
+            pair_precision = combined[undecided]
+            near_pairs = near.copy()
+            near_pairs[undecided] = exact + pair_precision <= threshold
+            possible_pairs = np.zeros(len(rows), dtype=bool)
+            possible_pairs[undecided] = (exact + pair_precision > threshold) & (exact - pair_precision <= threshold)
+
+            certain += np.bincount(rows[near_pairs], minlength=count)
+            possible += np.bincount(rows[possible_pairs], minlength=count)
+            self._keep_nearest(nearest["near"], rows[near_pairs], cols[near_pairs], estimate[near_pairs])
+            self._keep_nearest(
+                nearest["possible"], rows[possible_pairs], cols[possible_pairs], estimate[possible_pairs]
+            )
+            self._keep_nearest(nearest["any"], rows, cols, estimate)
+
+            self.stats["pairs"] += len(rows)
+            self.stats["pruned_far"] += int(far.sum())
+            self.stats["pruned_near"] += int(near.sum())
+            self.stats["exact"] += len(exact)
+
+        status = np.where(
+            certain > 0, self.CERTAINLY_NEAR, np.where(possible > 0, self.POSSIBLY_NEAR, self.CERTAINLY_FAR)
+        )
+        # La distancia publicada es la geodésica del par que decide el estado
+        deciding = np.where(
+            certain > 0, nearest["near"][1], np.where(possible > 0, nearest["possible"][1], nearest["any"][1])
+        )
+        distance = np.full(count, np.inf)
+        for i in np.flatnonzero(deciding >= 0):
+            j = deciding[i]
+            distance[i] = calculate_distance(
+                (float(victim["lats"][i]), float(victim["lngs"][i])),
+                (float(aggressor["lats"][j]), float(aggressor["lngs"][j])),
+            )
+
+        results = victim["data"].copy()
+        results["status"] = status
+        results["certain_pairs"] = certain
+        results["possible_pairs"] = possible
+        results["distance"] = distance
+        return results
+
+    @staticmethod
+    def _keep_nearest(nearest, rows, cols, estimate):
+        """
+        Updates, for every victim fix, the aggressor fix with the smallest estimate among the given pairs.
+        """
+        if not len(rows):
+            return
+        estimates, indices = nearest
+        order = np.lexsort((estimate, rows))
+        rows, cols, estimate = rows[order], cols[order], estimate[order]
+        first = np.concatenate([[True], rows[1:] != rows[:-1]])
+        rows, cols, estimate = rows[first], cols[first], estimate[first]
+        better = estimate < estimates[rows]
+        estimates[rows[better]] = estimate[better]
+        indices[rows[better]] = cols[better]
+
+    def summary(self):
+        """
+        Counts the victim fixes of each status.
+
+        Returns:
+            dict: Number of victim fixes per status.
+        """
+        counts = self.results["status"].value_counts()
+        return {
+            status: int(counts.get(status, 0))
+            for status in (self.CERTAINLY_NEAR, self.POSSIBLY_NEAR, self.CERTAINLY_FAR)
+        }
+
+    def build_map(self, center=None):
+        """
+        Draws the aggressor route and the victim fixes that are certainly or possibly near.
+
+        Certainly near fixes get a red proximity circle and possibly near fixes an
+        orange one, plus a gray circle with their own precision radius.
+
+        Args:
+            center (tuple[float, float], optional): Center of the map. Defaults to the
+                first aggressor fix.
+
+        Returns:
+            Map: The map with the markers, routes and circles.
+        """
+        colors = {self.CERTAINLY_NEAR: "red", self.POSSIBLY_NEAR: "orange"}
+        shown = self.results[self.results["status"].isin(list(colors))]
+        alerts = [
+            (i, row, self.proximity_distance, colors[row["status"]],
+             f"Proximity Alert ({row['status']}): {row['distance']:.2f}m")
+            for i, row in shown.iterrows()
+        ]
+        map_instance = Map.from_alerts(self.aggressor, self.victim, alerts, center)
+
+        for i in shown.index:
+            precision = float(self.victim["precision"][i])
+            if precision > 0:
+                location = (float(self.victim["lats"][i]), float(self.victim["lngs"][i]))
+                map_instance.add_proximity_circle(location, precision, "gray", f"Precision: {precision}m")
+        return map_instance
@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+
+from classes.Map import Map
+from src.distance import HAVERSINE_MARGIN, calculate_distance, candidate_pairs, haversine_distance, prepare_track
+
+
+class ProximitySweep:
+    def __init__(self, victim_data, aggressor_data, max_time_gap=None, episode_gap=None, block_size=1 << 20):
+        """
+        Computes, in a single pass, the closest aggressor fix to every victim fix.
+
+        The distance work is done once, over the pairs given by `candidate_pairs`. The
+        closest aggressor fix is searched with the haversine estimates first, and only
+        the fixes that can still beat the best geodesic distance found are evaluated
+        with `calculate_distance`. Alert counts, episodes and maps for any threshold
+        are derived from these minimum distances without touching the aggressor data
+        again.
+
+        Args:
+            victim_data (pandas.DataFrame): Victim fixes with "time" and "location" columns.
+            aggressor_data (pandas.DataFrame): Aggressor fixes with "time" and "location" columns.
+            max_time_gap (float, optional): Only aggressor fixes at most this many seconds
+                away from the victim fix are considered. Defaults to None (any time).
+            episode_gap (float, optional): Consecutive alerts further apart than this many
+                seconds belong to different episodes. Defaults to None (no limit).
+            block_size (int, optional): Maximum pairs compared at once. Defaults to 1048576.
+        """
+        self.max_time_gap = max_time_gap
+        self.episode_gap = episode_gap
+
+        self.victim = prepare_track(victim_data, require_time=False)
+        self.aggressor = prepare_track(aggressor_data, require_time=False)
+        self.results = self._sweep(block_size)
+
+        # Distancias ordenadas para contar alertas y episodios con búsquedas binarias
+        distances = self.results["min_distance"].to_numpy()
+        previous = np.concatenate([[np.inf], distances[:-1]])
+        if episode_gap is not None:
+            gaps = np.diff(self.victim["times"], prepend=-np.inf)
+            previous = np.where(gaps > episode_gap, np.inf, previous)
+        self._sorted_distances = np.sort(distances)
+        self._sorted_continuations = np.sort(np.maximum(distances, previous))
+
+    def _sweep(self, block_size):
+        """
+        Finds the closest aggressor fix of every victim fix.
+        """
+        victim, aggressor = self.victim, self.aggressor
+        count = len(victim["lats"])
+
+        # Primera pasada: distancia haversine mínima de cada fijación de la víctima
+        estimate = np.full(count, np.inf)
+        for rows, cols in candidate_pairs(victim["times"], aggressor["times"], self.max_time_gap, block_size):
+            np.minimum.at(estimate, rows, self._estimate(rows, cols))
+
+        # Segunda pasada: la geodésica difiere de la haversine menos de HAVERSINE_MARGIN,
+        # así que solo los candidatos dentro de ese margen del mínimo pueden ser el más
+        # cercano. Se evalúan de menor a mayor haversine y se descartan los que ya no
+        # pueden mejorar el mínimo encontrado.
+        limit = estimate * (1 + HAVERSINE_MARGIN) / (1 - HAVERSINE_MARGIN)
+        min_distance = np.full(count, np.inf)
+        closest = np.full(count, -1)
+        for rows, cols in candidate_pairs(victim["times"], aggressor["times"], self.max_time_gap, block_size):
+            estimates = self._estimate(rows, cols)
+            candidates = np.flatnonzero(estimates <= limit[rows])
+            candidates = candidates[np.lexsort((estimates[candidates], rows[candidates]))]
+            for i, j, lower in zip(
+                rows[candidates].tolist(),
+                cols[candidates].tolist(),
+                (estimates[candidates] * (1 - HAVERSINE_MARGIN)).tolist(),
+            ):
+                if lower >= min_distance[i]:
+                    continue
+                distance = calculate_distance(
+                    (float(victim["lats"][i]), float(victim["lngs"][i])),
+                    (float(aggressor["lats"][j]), float(aggressor["lngs"][j])),
+                )
+                if distance < min_distance[i]:
+                    min_distance[i] = distance
+                    closest[i] = j
+
+        found = closest >= 0
+        time_gap = np.full(count, np.nan)
+        time_gap[found] = np.abs(victim["times"][found] - aggressor["times"][closest[found]])
+
+        results = victim["data"].copy()
+        results["min_distance"] = min_distance
+        results["time_gap"] = time_gap
+        results["aggressor_time"] = [
+            aggressor["data"]["time"].iloc[j] if j >= 0 else None for j in closest
+        ]
+        return results
+
+    def _estimate(self, rows, cols):
+        """
+        Haversine distances of the given victim/aggressor index pairs.
+        """
+        return haversine_distance(
+            self.victim["lats"][rows], self.victim["lngs"][rows],
+            self.aggressor["lats"][cols], self.aggressor["lngs"][cols],
+        )
+
+    def alerts(self, threshold):
+        """
+        Returns the victim fixes with an aggressor fix closer than the threshold.
+
+        Args:
+            threshold (float): Distance threshold in meters.
+
+        Returns:
+            pandas.DataFrame: The alerting victim fixes with their "min_distance",
+                "time_gap" and "aggressor_time".
+        """
+        return self.results[self.results["min_distance"] <= threshold]
+
+    def episodes(self, threshold):
+        """
+        Groups the alerts of a threshold into episodes of consecutive alerting fixes.
+
+        Args:
+            threshold (float): Distance threshold in meters.
+
+        Returns:
+            pandas.DataFrame: One row per episode with its "start" and "end" times,
+                number of "fixes" and "min_distance".
+        """
+        alert = (self.results["min_distance"] <= threshold).to_numpy()
+        starts = alert & ~np.concatenate([[False], alert[:-1]])
+        if self.episode_gap is not None:
+            gaps = np.diff(self.victim["times"], prepend=-np.inf)
+            starts |= alert & (gaps > self.episode_gap)
+
+        alerts = self.results[alert].assign(episode=np.cumsum(starts)[alert])
+        episodes = alerts.groupby("episode").agg(
+            start=("time", "first"), end=("time", "last"), fixes=("time", "size"), min_distance=("min_distance", "min")
+        )
+        return episodes.reset_index(drop=True)
+
+    def summary(self, thresholds):
+        """
+        Counts alerts and episodes for a list of thresholds.
+
+        Each threshold costs two binary searches over the precomputed distances.
+
+        Args:
+            thresholds (list[float]): Distance thresholds in meters.
+
+        Returns:
+            pandas.DataFrame: One row per threshold with its "alerts" and "episodes".
+        """
+        thresholds = np.asarray(sorted(thresholds), dtype=float)
+        alerts = np.searchsorted(self._sorted_distances, thresholds, side="right")
+        continuations = np.searchsorted(self._sorted_continuations, thresholds, side="right")
+        return pd.DataFrame({"threshold": thresholds, "alerts": alerts, "episodes": alerts - continuations})
+
+    def build_map(self, threshold, center=None):
+        """
+        Draws the aggressor route and the victim alerts of a threshold on a new map.
+
+        Args:
+            threshold (float): Distance threshold in meters.
+            center (tuple[float, float], optional): Center of the map. Defaults to the
+                first aggressor fix.
+
+        Returns:
+            Map: The map with the markers, routes and proximity circles.
+        """
+        alerts = [
+            (i, row, threshold, "orange", f"Proximity Alert: {row['min_distance']:.2f}m")
+            for i, row in self.alerts(threshold).iterrows()
+        ]
+        return Map.from_alerts(self.aggressor, self.victim, alerts, center)
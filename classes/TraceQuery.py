@@ -0,0 +1,222 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from src.distance import calculate_distance, prepare_track
+from src.utils import to_epoch_seconds
+
+# Longitud mínima (en metros) de un grado de latitud y de un grado de longitud en el
+# ecuador. Con ellas ninguna celda de la rejilla mide menos de `cell_size` metros.
+METERS_PER_DEGREE_LAT = 110574.0
+METERS_PER_DEGREE_LNG = 111320.0
+
+# Diferencia máxima por defecto (en segundos) entre dos fijaciones que se interpolan o comparan
+MAX_TIME_GAP = 300
+
+
+class TraceQuery:
+    VICTIM = "victim"
+    AGGRESSOR = "aggressor"
+
+    def __init__(self, victim_data, aggressor_data, cell_size=500):
+        """
+        Builds the time and spatial indexes used to answer queries over the loaded traces.
+
+        Each trace is sorted once by its epoch time, so point-in-time and time-range
+        lookups are binary searches. Fixes are also bucketed into a grid of cells of
+        roughly `cell_size` meters; each cell keeps its fixes sorted by time so that
+        encounter searches only visit neighbouring cells and the relevant time span.
+
+        Args:
+            victim_data (pandas.DataFrame): Victim fixes with "time" and "location" columns.
+            aggressor_data (pandas.DataFrame): Aggressor fixes with "time" and "location" columns.
+            cell_size (float, optional): Approximate side of a grid cell in meters. Defaults to 500.
+        """
+        self.cell_size = cell_size
+        self.cell_lat = cell_size / METERS_PER_DEGREE_LAT
+
+        victim = prepare_track(victim_data)
+        aggressor = prepare_track(aggressor_data)
+
+        # Las celdas se ensanchan en longitud según la latitud más alejada del ecuador,
+        # de forma que ninguna celda mida menos de `cell_size` metros en ningún eje.
+        lats = np.concatenate([victim["lats"], aggressor["lats"]])
+        max_lat = min(float(np.abs(lats).max()), 89.0) if len(lats) else 0.0
+        self.cell_lng = cell_size / (METERS_PER_DEGREE_LNG * math.cos(math.radians(max_lat)))
+
+        self.traces = {self.VICTIM: victim, self.AGGRESSOR: aggressor}
+        for trace in self.traces.values():
+            trace["cells"] = self._build_cells(trace)
+
+    def _cell(self, lat, lng):
+        """
+        Returns the grid cell containing a coordinate.
+        """
+        return math.floor(lat / self.cell_lat), math.floor(lng / self.cell_lng)
+
+    def _build_cells(self, trace):
+        """
+        Groups the fixes of a trace by grid cell. Indices stay sorted by time.
+        """
+        rows = np.floor(trace["lats"] / self.cell_lat).astype(int)
+        cols = np.floor(trace["lngs"] / self.cell_lng).astype(int)
+        cells = {}
+        for index, key in enumerate(zip(rows.tolist(), cols.tolist())):
+            cells.setdefault(key, []).append(index)
+        return {
+            key: (np.asarray(indices), trace["times"][indices])
+            for key, indices in cells.items()
+        }
+
+    def _trace(self, entity):
+        """
+        Returns the indexed trace of an entity ("victim" or "aggressor").
+        """
+        try:
+            return self.traces[entity]
+        except KeyError:
+            raise ValueError(f"Entidad no válida: {entity}. Usa '{self.VICTIM}' o '{self.AGGRESSOR}'.")
+
+    @staticmethod
+    def _epoch(value):
+        """
+        Converts a time to epoch seconds. Numbers are taken as epoch seconds already.
+        """
+        if isinstance(value, (int, float, np.number)):
+            return float(value)
+        return to_epoch_seconds(value)
+
+    def _bounds(self, times, start, end):
+        """
+        Returns the [lo, hi) index range of the sorted times inside [start, end].
+        """
+        lo = 0 if start is None else int(np.searchsorted(times, self._epoch(start), side="left"))
+        hi = len(times) if end is None else int(np.searchsorted(times, self._epoch(end), side="right"))
+        return lo, hi
+
+    def position_at(self, entity, when, max_gap=MAX_TIME_GAP):
+        """
+        Returns the position of an entity at a given time.
+
+        When there is no fix at that exact time, the position is linearly interpolated
+        between the previous and the next fix.
+
+        Args:
+            entity (str): "victim" or "aggressor".
+            when (str | float | pandas.Timestamp): The time to look up (numbers are epoch seconds).
+            max_gap (float, optional): Maximum number of seconds between the two fixes
+                used for the interpolation. If None, there is no limit. Defaults to MAX_TIME_GAP.
+
+        Returns:
+            tuple[float, float] | None: Latitude and longitude, or None if the time is
+                outside the trace or the surrounding fixes are too far apart.
+        """
+        trace = self._trace(entity)
+        times = trace["times"]
+        t = self._epoch(when)
+
+        i = np.searchsorted(times, t, side="left")
+        if i < len(times) and times[i] == t:
+            return float(trace["lats"][i]), float(trace["lngs"][i])
+        if i == 0 or i == len(times):
+            return None
+
+        t0, t1 = times[i - 1], times[i]
+        if max_gap is not None and t1 - t0 > max_gap:
+            return None
+        ratio = (t - t0) / (t1 - t0)
+        lat = trace["lats"][i - 1] + ratio * (trace["lats"][i] - trace["lats"][i - 1])
+        lng = trace["lngs"][i - 1] + ratio * (trace["lngs"][i] - trace["lngs"][i - 1])
+        return float(lat), float(lng)
+
+    def time_slice(self, entity, start=None, end=None):
+        """
+        Returns the fixes of an entity between two times (both inclusive).
+
+        Args:
+            entity (str): "victim" or "aggressor".
+            start (str | pandas.Timestamp, optional): Start of the range.
+            end (str | pandas.Timestamp, optional): End of the range.
+
+        Returns:
+            pandas.DataFrame: The fixes in the range, ordered by time.
+        """
+        trace = self._trace(entity)
+        lo, hi = self._bounds(trace["times"], start, end)
+        return trace["data"].iloc[lo:hi]
+
+    def nearby(self, entity, lat, lng, distance, start=None, end=None):
+        """
+        Yields the fixes of an entity within a distance of a point and a time range.
+
+        Only the grid cells that can contain such fixes are visited, and inside each
+        cell the time range is located with a binary search.
+
+        Args:
+            entity (str): "victim" or "aggressor".
+            lat (float): Latitude of the point.
+            lng (float): Longitude of the point.
+            distance (float): Maximum distance in meters.
+            start (str | float | pandas.Timestamp, optional): Start of the time range.
+            end (str | float | pandas.Timestamp, optional): End of the time range.
+
+        Yields:
+            tuple[int, float]: The index of the fix in the sorted trace and its distance in meters.
+        """
+        trace = self._trace(entity)
+        row, col = self._cell(lat, lng)
+        ring = max(1, math.ceil(distance / self.cell_size))
+        for d_row in range(-ring, ring + 1):
+            for d_col in range(-ring, ring + 1):
+                cell = trace["cells"].get((row + d_row, col + d_col))
+                if cell is None:
+                    continue
+                indices, times = cell
+                lo, hi = self._bounds(times, start, end)
+                for index in indices[lo:hi]:
+                    meters = calculate_distance(
+                        (lat, lng), (float(trace["lats"][index]), float(trace["lngs"][index]))
+                    )
+                    if meters <= distance:
+                        yield int(index), meters
+
+    def encounters(self, start=None, end=None, proximity_distance=500, max_time_gap=MAX_TIME_GAP):
+        """
+        Lists the encounters between victim and aggressor in a time window.
+
+        An encounter is a victim fix inside the window with an aggressor fix closer
+        than `proximity_distance` meters and at most `max_time_gap` seconds apart.
+
+        Args:
+            start (str | pandas.Timestamp, optional): Start of the window.
+            end (str | pandas.Timestamp, optional): End of the window.
+            proximity_distance (float, optional): Distance threshold in meters. Defaults to 500.
+            max_time_gap (float, optional): Maximum time difference in seconds. If None,
+                any aggressor fix counts regardless of its time. Defaults to MAX_TIME_GAP.
+
+        Returns:
+            pandas.DataFrame: One row per victim/aggressor pair, ordered by victim time.
+        """
+        victim = self._trace(self.VICTIM)
+        aggressor = self._trace(self.AGGRESSOR)
+        lo, hi = self._bounds(victim["times"], start, end)
+
+        encounters = []
+        for i in range(lo, hi):
+            t = victim["times"][i]
+            window = (None, None) if max_time_gap is None else (t - max_time_gap, t + max_time_gap)
+            for j, meters in self.nearby(
+                self.AGGRESSOR, victim["lats"][i], victim["lngs"][i], proximity_distance, *window
+            ):
+                encounters.append({
+                    "victim_time": victim["data"]["time"].iloc[i],
+                    "aggressor_time": aggressor["data"]["time"].iloc[j],
+                    "victim_location": (float(victim["lats"][i]), float(victim["lngs"][i])),
+                    "aggressor_location": (float(aggressor["lats"][j]), float(aggressor["lngs"][j])),
+                    "distance": meters,
+                    "time_gap": abs(aggressor["times"][j] - t),
+                })
+
+        columns = ["victim_time", "aggressor_time", "victim_location", "aggressor_location", "distance", "time_gap"]
+        return pd.DataFrame(encounters, columns=columns)
@@ -1,13 +1,173 @@
+import argparse
+
+from classes.AnalysisServer import AnalysisServer
+from classes.CaseStore import CaseStore
+from classes.CoMovement import CoMovement
 from classes.FileSystem import FileSystem
 from classes.Map import Map
+from classes.PrecisionProximity import PrecisionProximity
+from classes.ProximitySweep import ProximitySweep
+from classes.TraceQuery import MAX_TIME_GAP, TraceQuery
+from src.distance import configure_distance_cache
 from src.utils import choose_file
 
-def main():
+
+def trace_arguments():
+    """
+    Builds the parent parser with the trace arguments shared by the analysis subcommands.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--aggressor", required=True, help="CSV, directorio o patrón glob del agresor")
+    parser.add_argument("--victim", required=True, help="CSV, directorio o patrón glob de la víctima")
+    return parser
+
+
+def parse_args(argv=None):
+    traces = trace_arguments()
+    parser = argparse.ArgumentParser(description="GeoTrace Analyzer")
+    parser.add_argument("--playback", action="store_true", help="Añade al mapa la reproducción temporal de las trazas")
+    subparsers = parser.add_subparsers(dest="command")
+
+    query = subparsers.add_parser("query", parents=[traces], help="Consultas sobre las trazas cargadas")
+    query.add_argument("--at", help="Posición de ambas entidades en ese instante")
+    query.add_argument("--start", help="Inicio de la ventana temporal")
+    query.add_argument("--end", help="Fin de la ventana temporal")
+    query.add_argument("--distance", type=float, help="Distancia de proximidad en metros")
+    query.add_argument(
+        "--max-gap", type=float, default=MAX_TIME_GAP, help="Diferencia máxima en segundos entre fijaciones"
+    )
+
+    sweep = subparsers.add_parser(
+        "sweep", parents=[traces], help="Alertas y episodios para varias distancias de proximidad"
+    )
+    sweep.add_argument("--thresholds", type=float, nargs="+", required=True, help="Distancias en metros")
+    sweep.add_argument("--max-gap", type=float, help="Diferencia máxima en segundos entre fijaciones")
+    sweep.add_argument("--episode-gap", type=float, help="Segundos sin alertas que separan dos episodios")
+    sweep.add_argument("--maps", action="store_true", help="Genera un mapa por cada distancia")
+
+    precision = subparsers.add_parser(
+        "precision", parents=[traces], help="Proximidad teniendo en cuenta la precisión de cada fijación"
+    )
+    precision.add_argument("--distance", type=float, help="Distancia de proximidad en metros")
+    precision.add_argument("--max-gap", type=float, help="Diferencia máxima en segundos entre fijaciones")
+    precision.add_argument("--map", action="store_true", help="Genera el mapa de alertas")
+
+    follow = subparsers.add_parser(
+        "follow", parents=[traces], help="Detecta tramos en los que el agresor sigue a la víctima"
+    )
+    follow.add_argument("--distance", type=float, help="Distancia media máxima en metros")
+    follow.add_argument("--step", type=float, default=60, help="Segundos entre puntos de la rejilla temporal")
+    follow.add_argument("--window", type=int, default=10, help="Puntos de la rejilla por ventana")
+    follow.add_argument("--min-duration", type=float, default=600, help="Duración mínima de un tramo en segundos")
+
+    serve = subparsers.add_parser("serve", help="Servicio HTTP local con los casos cargados en memoria")
+    serve.add_argument("--host", default="127.0.0.1", help="Interfaz en la que escuchar")
+    serve.add_argument("--port", type=int, default=8000, help="Puerto en el que escuchar")
+    serve.add_argument("--max-cases", type=int, default=8, help="Número máximo de casos en memoria")
+
+    return parser.parse_args(argv)
+
+
+def load_traces(args):
+    """
+    Reads the traces of a subcommand and resolves its proximity distance.
+
+    Returns:
+        tuple: The aggressor and victim DataFrames and the `--distance` of the
+            subcommand, or the configured proximity distance if it was not given.
+    """
+    proximity_distance, _, _ = FileSystem.load_configuration()
+    aggressor_data = FileSystem.read_dataset(args.aggressor)
+    victim_data = FileSystem.read_dataset(args.victim)
+    distance = getattr(args, "distance", None)
+    return aggressor_data, victim_data, distance if distance is not None else proximity_distance
+
+
+def run_query(args):
+    aggressor_data, victim_data, distance = load_traces(args)
+    query = TraceQuery(victim_data, aggressor_data)
+
+    if args.at:
+        for entity in (TraceQuery.AGGRESSOR, TraceQuery.VICTIM):
+            print(f"{entity}: {query.position_at(entity, args.at, args.max_gap)}")
+        return
+
+    encounters = query.encounters(args.start, args.end, distance, args.max_gap)
+    if encounters.empty:
+        print("No se encontraron encuentros en la ventana indicada.")
+    else:
+        print(encounters.to_string(index=False))
+
+
+def run_sweep(args):
+    _, _, result_dir = FileSystem().setup_environment()
+    aggressor_data, victim_data, _ = load_traces(args)
+    sweep = ProximitySweep(victim_data, aggressor_data, args.max_gap, args.episode_gap)
+
+    print(sweep.summary(args.thresholds).to_string(index=False))
+    if args.maps:
+        for threshold in args.thresholds:
+            sweep.build_map(threshold).save(result_dir, f"map_sweep_{threshold:g}.html")
+
+
+def run_precision(args):
+    aggressor_data, victim_data, distance = load_traces(args)
+    proximity = PrecisionProximity(victim_data, aggressor_data, distance, args.max_gap)
+
+    for status, count in proximity.summary().items():
+        print(f"{status}: {count}")
+    stats = proximity.stats
+    print(
+        f"Pares: {stats['pairs']} (descartados por cotas: {stats['pruned_far'] + stats['pruned_near']}, "
+        f"calculados: {stats['exact']})"
+    )
+    if args.map:
+        _, _, result_dir = FileSystem().setup_environment()
+        proximity.build_map().save(result_dir, "map_precision.html")
+
+
+def run_follow(args):
+    aggressor_data, victim_data, distance = load_traces(args)
+    segments = CoMovement(victim_data, aggressor_data, args.step).detect(
+        distance, args.window, min_duration=args.min_duration
+    )
+    if segments.empty:
+        print("No se detectaron tramos de desplazamiento conjunto.")
+    else:
+        print(segments.to_string(index=False))
+
+
+def run_server(args):
+    proximity_distance, secured_areas, valid_precision = FileSystem.load_configuration()
+    store = CaseStore(FileSystem.load_cases(), args.max_cases, valid_precision)
+    AnalysisServer(store, proximity_distance, secured_areas, args.host, args.port).serve_forever()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_distance_cache(**FileSystem.load_distance_cache())
+
+    if args.command == "query":
+        run_query(args)
+        return
+    if args.command == "sweep":
+        run_sweep(args)
+        return
+    if args.command == "precision":
+        run_precision(args)
+        return
+    if args.command == "follow":
+        run_follow(args)
+        return
+    if args.command == "serve":
+        run_server(args)
+        return
+
     fs = FileSystem()
-    
+
     # Cargar la configuración
     proximity_distance, secured_areas, _ = FileSystem.load_configuration()
-    
+
     # Configurar el entorno de trabajo
     _, data_dir, result_dir = fs.setup_environment()
 
@@ -15,8 +175,8 @@ def main():
     victim_file = choose_file("VÍCTIMAS")
 
     # Leer datos desde los ficheros seleccionados
-    aggressor_data = FileSystem.read_data(FileSystem.get_csv_file(aggressor_file))
-    victim_data = FileSystem.read_data(FileSystem.get_csv_file(victim_file))
+    aggressor_data = FileSystem.read_dataset(aggressor_file)
+    victim_data = FileSystem.read_dataset(victim_file)
 
     # Buscar la primera área segura activa y usarla para centrar el mapa
     active_area = next((area for area in secured_areas if area['active']), None)
@@ -34,6 +194,13 @@ def main():
     FileSystem.process_secured_areas(map_instance, secured_areas, proximity_distance)
     map_instance.check_prox_and_add_markers(victim_data, aggressor_data, proximity_distance)
 
+    # Reproducción temporal de las trazas y de los episodios de alerta
+    if args.playback:
+        map_instance.add_playback(aggressor_data, "Agresor", "red")
+        map_instance.add_playback(victim_data, "Víctima", "green")
+        episodes = ProximitySweep(victim_data, aggressor_data).episodes(proximity_distance)
+        map_instance.add_playback_episodes(victim_data, episodes)
+
     # Guardar el mapa
     map_instance.save(result_dir, "map_points.html")
 
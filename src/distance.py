@@ -1,20 +1,176 @@
 from geopy.distance import geodesic
-from functools import lru_cache
+from collections import OrderedDict, namedtuple
+import math
+import threading
+import numpy as np
+import pandas as pd
+from src.utils import to_epoch_seconds
 
 # Constants for error messages
 INVALID_LOCATION_MSG = "Ubicación no válida en '{column}': {value}. Ignorando fila."
 UNEXPECTED_TYPE_MSG = "Valor inesperado en '{column}': {value}. Ignorando fila."
 
+# Radio medio de la Tierra en metros
+EARTH_RADIUS = 6371008.8
+
+# Margen relativo que cubre la diferencia entre la distancia haversine y la geodésica
+HAVERSINE_MARGIN = 0.006
+
+# Longitud máxima (en metros) de un grado de latitud (en los polos) y de longitud (en el ecuador)
+MAX_METERS_PER_DEGREE_LAT = 111694.0
+MAX_METERS_PER_DEGREE_LNG = 111320.0
+
+DistanceCacheInfo = namedtuple("DistanceCacheInfo", ["hits", "misses", "maxsize", "currsize", "resolution"])
+
+
+class DistanceCache:
+    def __init__(self, resolution=1e-6, maxsize=65536):
+        """
+        Bounded cache of geodesic distances keyed on quantized coordinates.
+
+        Coordinates are snapped to a grid of `resolution` degrees, so the near-identical
+        pairs produced while a device is stationary share one entry. The distance stored
+        for a key is computed between the centers of both grid cells, which keeps the
+        cached value independent of the first pair that filled it. Each coordinate moves
+        at most half a step on each axis, so the cached distance differs from the exact
+        one by at most `max_error()` meters (about 0.16 m for the default 1e-6 degrees).
+        With `resolution=None` the exact coordinates are used as the key.
+
+        Entries are evicted in least-recently-used order once `maxsize` is reached.
+        Each entry holds two small tuples and a float, roughly 200 bytes.
+
+        Args:
+            resolution (float | None, optional): Grid step in degrees. Defaults to 1e-6.
+            maxsize (int, optional): Maximum number of cached distances. Defaults to 65536.
+        """
+        if resolution is not None and resolution <= 0:
+            raise ValueError(f"La resolución de la caché debe ser positiva: {resolution}")
+        self.resolution = resolution
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def max_error(self):
+        """
+        Returns the maximum difference in meters between a cached and an exact distance.
+        """
+        if self.resolution is None:
+            return 0.0
+        per_point = self.resolution / 2 * math.hypot(MAX_METERS_PER_DEGREE_LAT, MAX_METERS_PER_DEGREE_LNG)
+        return 2 * per_point
+
+    def _quantize(self, coord):
+        """
+        Returns the grid cell of a coordinate.
+        """
+        if self.resolution is None:
+            return float(coord[0]), float(coord[1])
+        return round(coord[0] / self.resolution), round(coord[1] / self.resolution)
+
+    def distance(self, coord1, coord2):
+        """
+        Returns the distance in meters between two coordinates, using the cache when possible.
+        """
+        cell1, cell2 = self._quantize(coord1), self._quantize(coord2)
+        key = (cell1, cell2) if cell1 <= cell2 else (cell2, cell1)
+
+        with self._lock:
+            meters = self._entries.get(key)
+            if meters is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return meters
+            self.misses += 1
+
+        if self.resolution is None:
+            meters = geodesic(key[0], key[1]).meters
+        else:
+            meters = geodesic(
+                (key[0][0] * self.resolution, key[0][1] * self.resolution),
+                (key[1][0] * self.resolution, key[1][1] * self.resolution),
+            ).meters
+
+        with self._lock:
+            self._entries[key] = meters
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return meters
+
+    def info(self):
+        """
+        Returns the hit/miss statistics of the cache.
+        """
+        with self._lock:
+            return DistanceCacheInfo(self.hits, self.misses, self.maxsize, len(self._entries), self.resolution)
+
+    def clear(self):
+        """
+        Empties the cache and resets its statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+distance_cache = DistanceCache()
+
+
+def configure_distance_cache(resolution=1e-6, maxsize=65536):
+    """
+    Replaces the cache used by calculate_distance.
+    :param resolution: Grid step in degrees used to quantize the coordinates, or None for exact keys.
+    :param maxsize: Maximum number of cached distances.
+    :return: The new DistanceCache.
+    """
+    global distance_cache
+    distance_cache = DistanceCache(resolution, maxsize)
+    return distance_cache
+
 
-@lru_cache(maxsize=1024)
 def calculate_distance(coord1, coord2):
     """
     Calculates the distance in meters between two geographic coordinates using the geopy library.
+    Results are cached on quantized coordinates, see DistanceCache for the accuracy guarantee.
     :param coord1: Tuple (latitude, longitude) of the first point.
     :param coord2: Tuple (latitude, longitude) of the second point.
     :return: Distance in meters between the two points.
     """
-    return geodesic(coord1, coord2).meters
+    return distance_cache.distance(coord1, coord2)
+
+
+def haversine_distance(lat1, lng1, lat2, lng2):
+    """
+    Calculates great-circle distances in meters with the haversine formula on numpy arrays.
+    The inputs are broadcast against each other, so a column of points against a row of points
+    gives the full distance matrix. It differs from the geodesic distance by less than 0.5%.
+    :param lat1: Latitude(s) of the first point(s) in degrees.
+    :param lng1: Longitude(s) of the first point(s) in degrees.
+    :param lat2: Latitude(s) of the second point(s) in degrees.
+    :param lng2: Longitude(s) of the second point(s) in degrees.
+    :return: Numpy array of distances in meters.
+    """
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def initial_bearing(lat1, lng1, lat2, lng2):
+    """
+    Calculates the initial bearing from the first to the second point(s) on numpy arrays.
+    :param lat1: Latitude(s) of the first point(s) in degrees.
+    :param lng1: Longitude(s) of the first point(s) in degrees.
+    :param lat2: Latitude(s) of the second point(s) in degrees.
+    :param lng2: Longitude(s) of the second point(s) in degrees.
+    :return: Numpy array of bearings in degrees, clockwise from north in [0, 360).
+    """
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lng1, lat2, lng2))
+    d_lng = lng2 - lng1
+    x = np.sin(d_lng) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(d_lng)
+    return np.degrees(np.arctan2(x, y)) % 360
 
 
 def validate_location(location, column):
@@ -55,3 +211,77 @@ def extract_coordinates(row, column="location"):
     if location is None or not validate_location(location, column):
         return None
     return parse_coordinates(location, column)
+
+
+def coordinate_arrays(data, column="location"):
+    """
+    Parses the location column of a whole DataFrame at once.
+    :param data: DataFrame with a column of "latitude,longitude" strings.
+    :param column: The column name where the location strings are located.
+    :return: Tuple (latitudes, longitudes) of float numpy arrays, NaN where the location is not valid.
+    """
+    parts = data[column].astype("string").str.split(",", n=1, expand=True).reindex(columns=[0, 1])
+    lats = pd.to_numeric(parts[0].astype("string").str.strip(), errors="coerce")
+    lngs = pd.to_numeric(parts[1].astype("string").str.strip(), errors="coerce")
+    return lats.to_numpy(dtype=float), lngs.to_numpy(dtype=float)
+
+
+def prepare_track(data, column="location", require_time=True):
+    """
+    Parses the times, locations and precisions of a whole trace at once and sorts it by time.
+    :param data: DataFrame with "time" and location columns, and optionally "precision".
+    :param column: The column name where the location strings are located.
+    :param require_time: If True, fixes without a valid time are dropped; otherwise they are kept at the end.
+    :return: Dict with the valid rows ("data", reindexed from 0) and their "times" (epoch seconds),
+        "lats", "lngs" and "precision" (meters, 0 when missing) as numpy arrays.
+    """
+    times = to_epoch_seconds(pd.to_datetime(data["time"], errors="coerce"))
+    lats, lngs = coordinate_arrays(data, column)
+    valid = ~np.isnan(lats) & ~np.isnan(lngs)
+    if require_time:
+        valid &= ~np.isnan(times)
+    if "precision" in data.columns:
+        precision = pd.to_numeric(data["precision"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    else:
+        precision = np.zeros(len(data))
+
+    order = np.flatnonzero(valid)[np.argsort(times[valid], kind="stable")]
+    return {
+        "data": data.iloc[order].reset_index(drop=True),
+        "times": times[order],
+        "lats": lats[order],
+        "lngs": lngs[order],
+        "precision": precision[order],
+    }
+
+
+def candidate_pairs(times1, times2, max_time_gap=None, block_size=1 << 20):
+    """
+    Yields the (first, second) index pairs whose times are at most `max_time_gap` seconds apart.
+    The window of every fix of the first trace is found with two binary searches over the
+    sorted times of the second one, and the pairs are cut into blocks of at most
+    `block_size` regardless of how many fall in each window, so memory stays bounded on
+    both traces. Callers compare the pairs of each block with vectorized operations.
+    :param times1: Epoch seconds of the first trace.
+    :param times2: Epoch seconds of the second trace, sorted.
+    :param max_time_gap: Maximum time difference in seconds. If None, every pair is a candidate.
+    :param block_size: Maximum number of pairs per block.
+    :return: Generator of (indices1, indices2) numpy arrays with at most `block_size` pairs each,
+        grouped by the first index in ascending order. Fixes without time only pair when
+        `max_time_gap` is None.
+    """
+    times1 = np.asarray(times1, dtype=float)
+    if max_time_gap is None:
+        lo = np.zeros(len(times1), dtype=np.int64)
+        hi = np.full(len(times1), len(times2), dtype=np.int64)
+    else:
+        # Cada fijación solo se compara con la ventana [t - gap, t + gap] de la otra traza
+        lo = np.searchsorted(times2, times1 - max_time_gap, side="left")
+        hi = np.searchsorted(times2, times1 + max_time_gap, side="right")
+        hi = np.where(np.isnan(times1), lo, hi)
+    offsets = np.concatenate([[0], np.cumsum(hi - lo)])
+
+    for start in range(0, int(offsets[-1]), block_size):
+        pairs = np.arange(start, min(start + block_size, int(offsets[-1])))
+        first = np.searchsorted(offsets, pairs, side="right") - 1
+        yield first, lo[first] + pairs - offsets[first]
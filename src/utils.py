@@ -1,9 +1,18 @@
 import os
 
+import numpy as np
+import pandas as pd
+
 
 def list_data_files():
     data_folder = "./data"
-    files = [f for f in os.listdir(data_folder) if f.endswith(".csv")]
+    # Un subdirectorio con varios CSV se trata como una única traza
+    files = [
+        f for f in sorted(os.listdir(data_folder))
+        if f.endswith(".csv")
+        or (os.path.isdir(os.path.join(data_folder, f))
+            and any(c.endswith(".csv") for c in os.listdir(os.path.join(data_folder, f))))
+    ]
     return files
 
 
@@ -21,3 +30,16 @@ def choose_file(file_type):
         except ValueError:
             pass
         print("⚠️ Invalid option. Please try again.")
+
+
+def to_epoch_seconds(times):
+    """
+    Converts a timestamp or a sequence of timestamps into seconds since the epoch.
+    :param times: A timestamp (str, datetime, pd.Timestamp) or a sequence of them.
+    :return: A float for a single timestamp, otherwise a float numpy array (NaN for missing times).
+    """
+    times = pd.to_datetime(times)
+    if isinstance(times, pd.Timestamp):
+        return times.value / 1e9
+    values = np.asarray(times, dtype="datetime64[ns]")
+    return np.where(np.isnat(values), np.nan, values.astype("int64") / 1e9)
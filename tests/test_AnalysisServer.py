@@ -0,0 +1,112 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+from classes.AnalysisServer import AnalysisServer
+from classes.CaseStore import CaseStore
+from classes.TraceQuery import TraceQuery
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("case")
+    aggressor = tmp_path / "A.csv"
+    victim = tmp_path / "V.csv"
+    aggressor.write_text(
+        '"time","precision","location"\n'
+        '"2024-12-20 22:00:00",1.0,"28.4100, -16.5500"\n'
+        '"2024-12-20 22:10:00",1.0,"28.4200, -16.5500"\n'
+    )
+    victim.write_text(
+        '"time","precision","location"\n'
+        '"2024-12-20 22:00:30",1.0,"28.4101, -16.5500"\n'
+    )
+    broken = tmp_path / "broken.csv"
+    broken.write_text('"time","location"\n"2024-12-20 22:00:00","28.41, -16.55"\n')
+    store = CaseStore({
+        "case": {"aggressor": str(aggressor), "victim": str(victim)},
+        "broken": {"aggressor": str(broken), "victim": str(broken)},
+    }, valid_precision=10)
+    secured_areas = [{"name": "Domicilio", "coordinates": [28.42, -16.55], "type": "home"}]
+    server = AnalysisServer(store, 100, secured_areas, port=0)
+    server.start()
+    yield server
+    server.shutdown()
+
+
+def get(server, path):
+    host, port = server.address
+    with urllib.request.urlopen(f"http://{host}:{port}{path}") as response:
+        return response.read().decode("utf-8")
+
+
+def test_proximity(server):
+    encounters = json.loads(get(server, "/cases/case/proximity"))
+    assert len(encounters) == 1
+    assert encounters[0]["aggressor_time"] == "2024-12-20 22:00:00"
+
+
+def test_position(server):
+    positions = json.loads(get(server, "/cases/case/position?at=2024-12-20%2022:05:00&max_gap=600"))
+    assert positions["aggressor"] == pytest.approx([28.415, -16.55])
+
+
+def test_position_respects_max_gap(server):
+    positions = json.loads(get(server, "/cases/case/position?at=2024-12-20%2022:05:00&max_gap=60"))
+    assert positions["aggressor"] is None
+
+
+def test_geofence(server):
+    areas = json.loads(get(server, "/cases/case/geofence?distance=50"))
+    assert [fix["time"] for fix in areas[0]["fixes"]] == ["2024-12-20 22:10:00"]
+
+
+def test_map_fragment(server):
+    assert "<html>" in get(server, "/cases/case/map")
+
+
+def test_cases_are_kept_loaded(server):
+    get(server, "/cases/case/proximity")
+    assert "case" in json.loads(get(server, "/cases"))["loaded"]
+
+
+def test_unknown_case(server):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get(server, "/cases/unknown/proximity")
+    assert error.value.code == 404
+
+
+def test_missing_parameter(server):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get(server, "/cases/case/position")
+    assert error.value.code == 400
+
+
+def test_unknown_action(server):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get(server, "/cases/case/unknown")
+    assert error.value.code == 404
+
+
+@pytest.mark.parametrize("query", ["position?at=NaT", "position?at=nope", "proximity?distance=abc", "proximity?max_gap=-1"])
+def test_invalid_parameters_return_400(server, query):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get(server, f"/cases/case/{query}")
+    assert error.value.code == 400
+
+
+def test_unexpected_error_returns_500(server, monkeypatch):
+    def fail(*args, **kwargs):
+        raise ValueError("fallo interno")
+
+    monkeypatch.setattr(TraceQuery, "encounters", fail)
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get(server, "/cases/case/proximity")
+    assert error.value.code == 500
+
+
+def test_data_errors_are_not_404(server):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get(server, "/cases/broken/proximity")
+    assert error.value.code == 500
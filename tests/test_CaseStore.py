@@ -0,0 +1,83 @@
+import os
+import threading
+
+import pytest
+from classes.CaseStore import CaseStore, NotFoundError
+
+
+def write_trace(path, rows):
+    path.write_text('"time","precision","location"\n' + "".join(f'"{t}",1.0,"{loc}"\n' for t, loc in rows))
+
+
+@pytest.fixture
+def cases(tmp_path):
+    paths = {}
+    for case_id in ("c1", "c2", "c3"):
+        aggressor = tmp_path / f"{case_id}_A.csv"
+        victim = tmp_path / f"{case_id}_V.csv"
+        write_trace(aggressor, [("2024-12-20 22:00:00", "28.41, -16.55")])
+        write_trace(victim, [("2024-12-20 22:00:00", "28.41, -16.55")])
+        paths[case_id] = {"aggressor": str(aggressor), "victim": str(victim)}
+    return paths
+
+
+def test_get_loads_case_once(cases):
+    store = CaseStore(cases, valid_precision=10)
+    case = store.get("c1")
+    assert len(case["victim"]) == 1
+    assert store.get("c1") is case
+
+
+def test_get_unknown_case(cases):
+    store = CaseStore(cases, valid_precision=10)
+    with pytest.raises(NotFoundError):
+        store.get("unknown")
+
+
+def test_lru_eviction(cases):
+    store = CaseStore(cases, max_cases=2, valid_precision=10)
+    store.get("c1")
+    store.get("c2")
+    store.get("c1")
+    store.get("c3")
+    assert store.loaded() == ["c1", "c3"]
+
+
+def test_reload_on_file_change(cases):
+    store = CaseStore(cases, valid_precision=10)
+    case = store.get("c1")
+
+    victim_file = cases["c1"]["victim"]
+    with open(victim_file, "a") as file:
+        file.write('"2024-12-20 22:05:00",1.0,"28.42, -16.55"\n')
+    stat = os.stat(victim_file)
+    os.utime(victim_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    reloaded = store.get("c1")
+    assert reloaded is not case
+    assert len(reloaded["victim"]) == 2
+
+
+def test_loading_a_case_does_not_block_other_cases(cases, mocker):
+    store = CaseStore(cases, valid_precision=10)
+    store.get("c2")
+
+    loading = threading.Event()
+    release = threading.Event()
+    load = store._load
+
+    def slow_load(paths, signature):
+        loading.set()
+        release.wait(5)
+        return load(paths, signature)
+
+    mocker.patch.object(store, "_load", side_effect=slow_load)
+    thread = threading.Thread(target=store.get, args=("c1",))
+    thread.start()
+    try:
+        assert loading.wait(5)
+        assert len(store.get("c2")["victim"]) == 1
+    finally:
+        release.set()
+        thread.join()
+    assert store.loaded() == ["c2", "c1"]
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from classes.CoMovement import CoMovement
+
+# 1 grado de latitud ~ 110.6 km: 0.00002 grados cada 1 s ~ 2.2 m/s hacia el norte
+START = pd.Timestamp("2024-12-20 22:00:00")
+
+
+def track(seconds, lats, lng=-16.55):
+    return pd.DataFrame({
+        "time": [(START + pd.Timedelta(seconds=int(s))).strftime("%Y-%m-%d %H:%M:%S") for s in seconds],
+        "precision": 1.0,
+        "location": [f"{lat:.6f}, {lng}" for lat in lats],
+    })
+
+
+@pytest.fixture
+def victim_data():
+    seconds = np.arange(0, 3600, 30)
+    return track(seconds, 28.4 + 0.00002 * seconds)
+
+
+@pytest.fixture
+def follower_data():
+    # Sigue a la víctima ~100 m por detrás durante los primeros 30 minutos y luego se queda quieto
+    seconds = np.arange(0, 3600, 45)
+    lats = 28.4 + 0.00002 * np.minimum(seconds, 1800) - 0.0009
+    return track(seconds, lats)
+
+
+def test_aligned_grid(victim_data, follower_data):
+    co_movement = CoMovement(victim_data, follower_data, step=60)
+    aligned = co_movement.aligned
+    assert aligned["time"].iloc[0] == START
+    assert (aligned["time"].diff().dropna() == pd.Timedelta(seconds=60)).all()
+    assert aligned["distance"].iloc[10] == pytest.approx(99.5, abs=1)
+    assert aligned["victim_heading"].iloc[10] == pytest.approx(0, abs=0.1)
+    assert aligned["victim_speed"].iloc[10] == pytest.approx(2.2, abs=0.1)
+
+
+def test_gaps_are_not_interpolated(victim_data, follower_data):
+    victim_data = victim_data.drop(index=range(20, 60))
+    aligned = CoMovement(victim_data, follower_data, step=60, max_gap=600).aligned
+    assert aligned["victim_lat"].isna().any()
+    assert aligned["victim_lat"].iloc[0] == pytest.approx(28.4)
+
+
+def test_detects_following_segment(victim_data, follower_data):
+    segments = CoMovement(victim_data, follower_data).detect()
+    assert len(segments) == 1
+    segment = segments.iloc[0]
+    assert segment["start"] <= START + pd.Timedelta(minutes=1)
+    assert segment["end"] <= START + pd.Timedelta(minutes=35)
+    assert segment["duration"] >= 1700
+    assert segment["mean_distance"] < 150
+    assert segment["heading_similarity"] > 0.99
+
+
+def test_opposite_direction_is_not_following(victim_data):
+    seconds = np.arange(0, 3600, 30)
+    opposite = track(seconds, 28.4 + 0.00002 * (3600 - seconds) - 0.036)
+    assert CoMovement(victim_data, opposite).detect(max_distance=10000).empty
+
+
+def test_no_common_period(victim_data):
+    later = track([7200, 7300], [28.4, 28.41])
+    co_movement = CoMovement(victim_data, later)
+    assert co_movement.aligned.empty
+    assert co_movement.detect().empty
@@ -104,3 +104,118 @@ def test_load_configuration(file_system, mock_env_vars):
     assert proximity_distance == 500
     assert secured_areas == [{"name": "Area1", "coordinates": [0, 0]}]
     assert valid_precision == 1.0
+
+
+@pytest.fixture
+def sample_multi_csv_dir(tmp_path):
+    trace_dir = tmp_path / "trace"
+    trace_dir.mkdir()
+    (trace_dir / "day1.csv").write_text(
+        '"time","precision","location"\n'
+        '"2024-12-20 22:00:00",1.0,"1.0,1.0"\n'
+        '"2024-12-20 22:10:00",500.0,"1.1,1.1"\n'
+        '"2024-12-20 22:20:00",2.0,"1.2,1.2"\n'
+    )
+    (trace_dir / "day2.csv").write_text(
+        '"time","precision","location"\n'
+        '"2024-12-20 22:05:00",1.0,"2.0,2.0"\n'
+        '"2024-12-20 22:15:00",1.0,"2.1,2.1"'
+    )
+    (trace_dir / "day3.csv").write_text(
+        '"time","precision","location"\n'
+        '"2024-12-21 10:00:00",1.0,"3.0,3.0"\n'
+    )
+    return str(trace_dir)
+
+
+def test_get_csv_files_with_directory(sample_multi_csv_dir, file_system):
+    csv_files = file_system.get_csv_files(sample_multi_csv_dir)
+    assert [os.path.basename(f) for f in csv_files] == ["day1.csv", "day2.csv", "day3.csv"]
+
+
+def test_get_csv_files_with_glob(sample_multi_csv_dir, file_system):
+    csv_files = file_system.get_csv_files(os.path.join(sample_multi_csv_dir, "day[12].csv"))
+    assert len(csv_files) == 2
+
+
+def test_get_csv_files_no_match(tmp_path, file_system):
+    with pytest.raises(ValueError):
+        file_system.get_csv_files(str(tmp_path / "*.csv"))
+
+
+def test_get_time_bounds(sample_multi_csv_dir, file_system):
+    first, last = file_system.get_time_bounds(os.path.join(sample_multi_csv_dir, "day2.csv"))
+    assert first == pd.Timestamp("2024-12-20 22:05:00")
+    assert last == pd.Timestamp("2024-12-20 22:15:00")
+
+
+def test_read_dataset_merges_by_time(sample_multi_csv_dir, file_system):
+    df = file_system.read_dataset(sample_multi_csv_dir, valid_precision=10)
+    assert list(df["time"]) == [
+        "2024-12-20 22:00:00",
+        "2024-12-20 22:05:00",
+        "2024-12-20 22:15:00",
+        "2024-12-20 22:20:00",
+        "2024-12-21 10:00:00",
+    ]
+    assert all(df["precision"] <= 10)
+
+
+def test_read_dataset_skips_files_out_of_range(sample_multi_csv_dir, file_system, mocker):
+    read_data = mocker.spy(FileSystem, "read_data")
+    df = file_system.read_dataset(
+        sample_multi_csv_dir, start="2024-12-20 22:06:00", end="2024-12-20 23:00:00", valid_precision=10
+    )
+    assert list(df["location"]) == ["2.1,2.1", "1.2,1.2"]
+    assert read_data.call_count == 2
+
+
+def test_read_dataset_out_of_range_keeps_columns(sample_multi_csv_dir, file_system):
+    df = file_system.read_dataset(sample_multi_csv_dir, start="2030-01-01", valid_precision=10)
+    assert df.empty
+    assert list(df.columns) == ["time", "precision", "location", "valid"]
+
+
+def test_read_dataset_single_file_is_sorted(tmp_path, file_system):
+    csv_file = tmp_path / "unsorted.csv"
+    csv_file.write_text(
+        '"time","precision","location"\n'
+        '"2024-12-20 22:10:00",1.0,"1.1,1.1"\n'
+        '"2024-12-20 22:00:00",1.0,"1.0,1.0"\n'
+    )
+    df = file_system.read_dataset(str(csv_file), valid_precision=10)
+    assert list(df["location"]) == ["1.0,1.0", "1.1,1.1"]
+    assert list(df.index) == [0, 1]
+
+
+def test_read_dataset_keeps_unsorted_file_in_range(tmp_path, file_system):
+    trace_dir = tmp_path / "unsorted"
+    trace_dir.mkdir()
+    (trace_dir / "a.csv").write_text('"time","precision","location"\n"2024-12-20 19:00:00",1.0,"1.0,1.0"\n')
+    (trace_dir / "b.csv").write_text(
+        '"time","precision","location"\n'
+        '"2024-12-20 20:00:00",1.0,"2.0,2.0"\n'
+        '"2024-12-20 21:00:00",1.0,"2.1,2.1"\n'
+        '"2024-12-20 20:30:00",1.0,"2.2,2.2"\n'
+    )
+    df = file_system.read_dataset(
+        str(trace_dir), start="2024-12-20 20:45:00", end="2024-12-20 21:30:00", valid_precision=10
+    )
+    assert list(df["location"]) == ["2.1,2.1"]
+
+
+def test_read_dataset_rejects_mixed_time_zones(tmp_path, file_system):
+    csv_file = tmp_path / "aware.csv"
+    csv_file.write_text('"time","precision","location"\n"2024-12-20 22:00:00+01:00",1.0,"1.0,1.0"\n')
+    with pytest.raises(ValueError):
+        file_system.read_dataset(str(csv_file), start="2024-12-20 21:00:00", valid_precision=10)
+    df = file_system.read_dataset(str(csv_file), start="2024-12-20 21:00:00+01:00", valid_precision=10)
+    assert len(df) == 1
+
+
+def test_read_dataset_matches_concatenation(sample_multi_csv_dir, file_system):
+    df = file_system.read_dataset(sample_multi_csv_dir, valid_precision=1000)
+    expected = pd.concat(
+        [file_system.read_data(f, 1000) for f in file_system.get_csv_files(sample_multi_csv_dir)], ignore_index=True
+    ).sort_values("time", kind="stable", ignore_index=True)
+    pd.testing.assert_frame_equal(df, expected)
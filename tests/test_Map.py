@@ -1,5 +1,10 @@
+import json
+
 import folium
+import numpy as np
+import pandas as pd
 import pytest
+from folium.plugins import TimestampedGeoJson
 from classes.Map import Map
 
 
@@ -88,3 +93,69 @@ def test_check_prox_and_add_markers(map_instance, mocker):
 
     map_instance.check_prox_and_add_markers(victim_data, aggressor_data, proximity_distance)
     assert isinstance(map_instance.map, folium.Map)
+
+
+@pytest.fixture
+def playback_data():
+    times = pd.date_range("2024-12-20 22:00:00", periods=720, freq="10s").strftime("%Y-%m-%d %H:%M:%S")
+    lats = 28.4 + 0.00005 * np.arange(720)
+    return pd.DataFrame({"time": times, "precision": 1.0, "location": [f"{lat}, -16.55" for lat in lats]})
+
+
+def playback_layer(map_instance):
+    return next(child for child in map_instance.map._children.values() if isinstance(child, TimestampedGeoJson))
+
+
+def test_add_playback_layer_on_save(map_instance, playback_data, tmp_path):
+    map_instance.add_playback(playback_data, "Agresor", "red")
+    map_instance.save(result_folder=str(tmp_path), output_file="playback.html")
+    data = json.loads(playback_layer(map_instance).data)
+    feature = data["features"][0]
+    assert feature["geometry"]["type"] == "LineString"
+    assert len(feature["properties"]["times"]) == len(feature["geometry"]["coordinates"])
+    assert feature["properties"]["times"][0] == "2024-12-20T22:00:00"
+    assert feature["properties"]["times"][-1] == "2024-12-20T23:59:50"
+
+
+def test_playback_is_downsampled(playback_data):
+    map_instance = Map(center=(28.4, -16.55), zoom_start=15, playback_period=60, playback_max_frames=30)
+    map_instance.add_playback(playback_data, "Agresor", "red")
+    map_instance.render()
+    layer = playback_layer(map_instance)
+    times = json.loads(layer.data)["features"][0]["properties"]["times"]
+    assert layer.period == "PT240S"
+    assert len(times) <= 32
+
+
+def test_playback_drops_stationary_fixes(map_instance):
+    stationary = pd.DataFrame({
+        "time": pd.date_range("2024-12-20 22:00:00", periods=100, freq="min").strftime("%Y-%m-%d %H:%M:%S"),
+        "location": "28.4, -16.55",
+    })
+    map_instance.add_playback(stationary, "Víctima", "green")
+    map_instance.render()
+    times = json.loads(playback_layer(map_instance).data)["features"][0]["properties"]["times"]
+    assert times == ["2024-12-20T22:00:00", "2024-12-20T23:39:00"]
+
+
+def test_playback_longitude_cell_does_not_shrink_with_latitude():
+    # A 60° de latitud, con zoom 15 un píxel abarca 360 / 256 / 2**15 grados de longitud
+    map_instance = Map(center=(60.0, 10.0), zoom_start=15)
+    lngs = 10.0 + 0.4 * 3 * 360 / 256 / 2 ** 15 * np.arange(100)
+    eastward = pd.DataFrame({
+        "time": pd.date_range("2024-12-20 22:00:00", periods=100, freq="min").strftime("%Y-%m-%d %H:%M:%S"),
+        "location": [f"60.0, {lng}" for lng in lngs],
+    })
+    map_instance.add_playback(eastward, "Víctima", "green")
+    map_instance.render()
+    times = json.loads(playback_layer(map_instance).data)["features"][0]["properties"]["times"]
+    assert len(times) <= 45
+
+
+def test_add_playback_episodes(map_instance, playback_data):
+    episodes = pd.DataFrame({"start": ["2024-12-20 22:00:00"], "end": ["2024-12-20 22:00:20"]})
+    map_instance.add_playback_episodes(playback_data, episodes)
+    map_instance.render()
+    features = json.loads(playback_layer(map_instance).data)["features"]
+    assert {feature["geometry"]["type"] for feature in features} == {"Point"}
+    assert features[0]["properties"]["time"] == "2024-12-20T22:00:00"
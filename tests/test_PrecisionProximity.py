@@ -0,0 +1,76 @@
+import folium
+import pandas as pd
+import pytest
+from geopy.distance import geodesic
+from classes.PrecisionProximity import PrecisionProximity
+
+
+@pytest.fixture
+def aggressor_data():
+    return pd.DataFrame({
+        "time": ["2024-12-20 22:00:00", "2024-12-20 23:00:00"],
+        "precision": [5.0, 5.0],
+        "location": ["28.4, -16.55", "29.4, -16.55"],
+    })
+
+
+@pytest.fixture
+def victim_data():
+    # A ~100 m, ~190 m y ~1100 m del primer agresor (1 grado de latitud ~ 110.6 km)
+    return pd.DataFrame({
+        "time": ["2024-12-20 22:00:00", "2024-12-20 22:01:00", "2024-12-20 22:02:00"],
+        "precision": [5.0, 20.0, 5.0],
+        "location": ["28.4009, -16.55", "28.4017, -16.55", "28.41, -16.55"],
+    })
+
+
+@pytest.fixture
+def proximity(victim_data, aggressor_data):
+    return PrecisionProximity(victim_data, aggressor_data, 200)
+
+
+def test_classification(proximity):
+    assert list(proximity.results["status"]) == [
+        PrecisionProximity.CERTAINLY_NEAR,
+        PrecisionProximity.POSSIBLY_NEAR,
+        PrecisionProximity.CERTAINLY_FAR,
+    ]
+
+
+def test_summary(proximity):
+    assert proximity.summary() == {"certainly_near": 1, "possibly_near": 1, "certainly_far": 1}
+
+
+def test_bounds_skip_exact_distances(proximity):
+    assert proximity.stats["pairs"] == 6
+    assert proximity.stats["pruned_far"] + proximity.stats["pruned_near"] + proximity.stats["exact"] == 6
+    assert proximity.stats["exact"] == 1
+
+
+def test_only_undecided_pairs_are_computed(victim_data, aggressor_data, mocker):
+    calculate_distance = mocker.patch("classes.PrecisionProximity.calculate_distance", return_value=190.0)
+    PrecisionProximity(victim_data, aggressor_data, 200)
+    # Un par sin decidir más la distancia del par decisivo de cada fijación de la víctima
+    assert calculate_distance.call_count == 1 + len(victim_data)
+
+
+def test_missing_precision_is_exact(victim_data, aggressor_data):
+    results = PrecisionProximity(victim_data.drop(columns="precision"), aggressor_data.drop(columns="precision"), 200).results
+    assert list(results["status"])[:2] == [PrecisionProximity.CERTAINLY_NEAR, PrecisionProximity.CERTAINLY_NEAR]
+
+
+def test_max_time_gap(victim_data, aggressor_data):
+    proximity = PrecisionProximity(victim_data, aggressor_data, 200, max_time_gap=30)
+    assert proximity.stats["pairs"] == 1
+    assert list(proximity.results["status"])[1] == PrecisionProximity.CERTAINLY_FAR
+
+
+def test_distance_is_geodesic_of_deciding_pair(proximity):
+    distances = proximity.results["distance"].to_list()
+    assert distances[0] == pytest.approx(geodesic((28.4009, -16.55), (28.4, -16.55)).meters, abs=0.2)
+    assert distances[0] + 10 <= 200
+    assert distances[2] == pytest.approx(geodesic((28.41, -16.55), (28.4, -16.55)).meters, abs=0.2)
+
+
+def test_build_map(proximity):
+    assert isinstance(proximity.build_map().map, folium.Map)
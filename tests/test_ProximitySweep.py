@@ -0,0 +1,83 @@
+import folium
+import pandas as pd
+import pytest
+from classes.ProximitySweep import ProximitySweep
+
+
+@pytest.fixture
+def victim_data():
+    # Fijaciones a ~50 m, ~150 m, ~1100 m y ~50 m del agresor (1 grado de latitud ~ 110.6 km)
+    return pd.DataFrame({
+        "time": ["2024-12-20 22:00:00", "2024-12-20 22:01:00", "2024-12-20 22:02:00", "2024-12-20 23:00:00"],
+        "precision": [1.0, 1.0, 1.0, 1.0],
+        "location": ["28.40045, -16.55", "28.40135, -16.55", "28.41, -16.55", "28.40045, -16.55"],
+    })
+
+
+@pytest.fixture
+def aggressor_data():
+    return pd.DataFrame({
+        "time": ["2024-12-20 22:00:00", "2024-12-20 23:00:00"],
+        "precision": [1.0, 1.0],
+        "location": ["28.4, -16.55", "28.4, -16.55"],
+    })
+
+
+@pytest.fixture
+def sweep(victim_data, aggressor_data):
+    return ProximitySweep(victim_data, aggressor_data)
+
+
+def test_min_distance_per_victim_fix(sweep):
+    distances = sweep.results["min_distance"].to_list()
+    assert distances[0] == pytest.approx(50, abs=1)
+    assert distances[1] == pytest.approx(150, abs=1)
+    assert distances[2] == pytest.approx(1107, abs=2)
+    assert sweep.results["time_gap"].iloc[1] == 60
+
+
+def test_alerts(sweep):
+    assert len(sweep.alerts(100)) == 2
+    assert len(sweep.alerts(200)) == 3
+
+
+def test_episodes(sweep):
+    episodes = sweep.episodes(100)
+    assert list(episodes["start"]) == ["2024-12-20 22:00:00", "2024-12-20 23:00:00"]
+    assert list(episodes["fixes"]) == [1, 1]
+
+
+def test_summary_matches_episodes(sweep):
+    summary = sweep.summary([2000, 100, 200])
+    assert list(summary["threshold"]) == [100, 200, 2000]
+    assert list(summary["alerts"]) == [2, 3, 4]
+    assert list(summary["episodes"]) == [len(sweep.episodes(t)) for t in (100, 200, 2000)]
+
+
+def test_episode_gap_splits_episodes(victim_data, aggressor_data):
+    sweep = ProximitySweep(victim_data, aggressor_data, episode_gap=1800)
+    assert list(sweep.summary([2000])["episodes"]) == [2]
+    assert len(sweep.episodes(2000)) == 2
+
+
+def test_max_time_gap(victim_data, aggressor_data):
+    sweep = ProximitySweep(victim_data, aggressor_data, max_time_gap=90)
+    assert sweep.results["min_distance"].iloc[2] == float("inf")
+    assert sweep.results["aggressor_time"].iloc[2] is None
+
+
+def test_build_map(sweep):
+    assert isinstance(sweep.build_map(200).map, folium.Map)
+
+
+def test_closest_by_geodesic_distance():
+    # En el ecuador la haversine acorta el este y alarga el norte: la fijación del
+    # norte está más lejos según la haversine pero más cerca según la geodésica.
+    victim = pd.DataFrame({"time": ["2024-12-20 22:00:00"], "location": ["0.0,0.0"]})
+    aggressor = pd.DataFrame({
+        "time": ["2024-12-20 22:00:00", "2024-12-20 22:00:30"],
+        "location": ["0.0,0.0009", "0.0009035,0.0"],
+    })
+    sweep = ProximitySweep(victim, aggressor)
+    assert sweep.results["aggressor_time"].iloc[0] == "2024-12-20 22:00:30"
+    assert sweep.results["min_distance"].iloc[0] == pytest.approx(99.90, abs=0.2)
@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+from classes.TraceQuery import TraceQuery
+
+
+@pytest.fixture
+def victim_data():
+    return pd.DataFrame({
+        "time": ["2024-12-20 22:10:00", "2024-12-20 22:00:00", "2024-12-20 22:20:00"],
+        "precision": [1.0, 1.0, 1.0],
+        "location": ["28.4100, -16.5500", "28.4000, -16.5500", "28.5000, -16.5500"],
+    })
+
+
+@pytest.fixture
+def aggressor_data():
+    return pd.DataFrame({
+        "time": ["2024-12-20 22:00:00", "2024-12-20 22:10:30", "2024-12-20 22:20:00", "2024-12-20 22:30:00"],
+        "precision": [1.0, 1.0, 1.0, 1.0],
+        "location": ["28.3000, -16.5500", "28.4101, -16.5500", "28.4000, -16.5500", 1.0],
+    })
+
+
+@pytest.fixture
+def query(victim_data, aggressor_data):
+    return TraceQuery(victim_data, aggressor_data)
+
+
+def test_position_at_exact_fix(query):
+    assert query.position_at("victim", "2024-12-20 22:10:00") == (28.41, -16.55)
+
+
+def test_position_at_interpolates(query):
+    lat, lng = query.position_at("victim", "2024-12-20 22:05:00", max_gap=600)
+    assert lat == pytest.approx(28.405)
+    assert lng == pytest.approx(-16.55)
+
+
+def test_position_at_outside_trace(query):
+    assert query.position_at("victim", "2024-12-20 21:00:00") is None
+    assert query.position_at("victim", "2024-12-20 22:05:00", max_gap=60) is None
+
+
+def test_position_at_does_not_bridge_long_silences_by_default(query):
+    assert query.position_at("victim", "2024-12-20 22:05:00") is None
+    assert query.position_at("victim", "2024-12-20 22:05:00", max_gap=None) is not None
+
+
+def test_position_at_invalid_entity(query):
+    with pytest.raises(ValueError):
+        query.position_at("witness", "2024-12-20 22:05:00")
+
+
+def test_time_slice_is_sorted_and_inclusive(query):
+    fixes = query.time_slice("victim", "2024-12-20 22:00:00", "2024-12-20 22:10:00")
+    assert list(fixes["time"]) == ["2024-12-20 22:00:00", "2024-12-20 22:10:00"]
+
+
+def test_time_slice_skips_invalid_locations(query):
+    assert len(query.time_slice("aggressor")) == 3
+
+
+def test_encounters_respects_time_gap(query):
+    encounters = query.encounters(proximity_distance=100, max_time_gap=60)
+    assert list(encounters["victim_time"]) == ["2024-12-20 22:10:00"]
+    assert encounters["time_gap"].iloc[0] == 30
+    assert encounters["distance"].iloc[0] < 100
+
+
+def test_encounters_without_time_gap(query):
+    encounters = query.encounters(proximity_distance=100, max_time_gap=None)
+    assert len(encounters) == 2
+
+
+def test_encounters_in_window(query):
+    encounters = query.encounters("2024-12-20 22:15:00", "2024-12-20 22:30:00", proximity_distance=100)
+    assert encounters.empty
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+from geopy.distance import geodesic
+from src.distance import (
+    DistanceCache, calculate_distance, candidate_pairs, configure_distance_cache, prepare_track
+)
+
+
+def test_near_identical_pairs_share_an_entry():
+    cache = DistanceCache(resolution=1e-5)
+    cache.distance((28.4147201, -16.5575601), (28.4156, -16.5563))
+    cache.distance((28.4147203, -16.5575599), (28.4156001, -16.5563))
+    info = cache.info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+
+def test_cache_is_symmetric():
+    cache = DistanceCache()
+    cache.distance((28.41, -16.55), (28.42, -16.56))
+    cache.distance((28.42, -16.56), (28.41, -16.55))
+    assert cache.info().hits == 1
+
+
+@pytest.mark.parametrize("resolution", [1e-6, 1e-5, 1e-4])
+def test_error_within_quantization_bound(resolution):
+    cache = DistanceCache(resolution=resolution)
+    pairs = [
+        ((28.414720, -16.557560), (28.415606, -16.556370)),
+        ((28.41766, -16.55079), (28.41992, -16.54293)),
+        ((43.3040521, -8.515486), (43.2927376, -8.5312681)),
+    ]
+    for coord1, coord2 in pairs:
+        exact = geodesic(coord1, coord2).meters
+        assert abs(cache.distance(coord1, coord2) - exact) <= cache.max_error()
+
+
+def test_exact_keys_without_resolution():
+    cache = DistanceCache(resolution=None)
+    coord1, coord2 = (28.4147201, -16.5575601), (28.4156, -16.5563)
+    assert cache.distance(coord1, coord2) == geodesic(coord1, coord2).meters
+    assert cache.max_error() == 0
+
+
+def test_lru_eviction():
+    cache = DistanceCache(maxsize=2)
+    cache.distance((0, 0), (0, 1))
+    cache.distance((0, 0), (0, 2))
+    cache.distance((0, 0), (0, 1))
+    cache.distance((0, 0), (0, 3))
+    cache.distance((0, 0), (0, 1))
+    info = cache.info()
+    assert info.currsize == 2
+    assert (info.hits, info.misses) == (2, 3)
+
+
+def test_clear():
+    cache = DistanceCache()
+    cache.distance((0, 0), (0, 1))
+    cache.clear()
+    assert cache.info() == (0, 0, cache.maxsize, 0, cache.resolution)
+
+
+def test_invalid_resolution():
+    with pytest.raises(ValueError):
+        DistanceCache(resolution=0)
+
+
+def test_configure_distance_cache():
+    cache = configure_distance_cache(resolution=1e-4, maxsize=10)
+    try:
+        calculate_distance((28.41, -16.55), (28.42, -16.56))
+        assert cache.info().misses == 1
+    finally:
+        configure_distance_cache()
+
+
+def test_prepare_track_sorts_and_drops_invalid_fixes():
+    data = pd.DataFrame({
+        "time": ["2024-01-01 10:02:00", "nope", "2024-01-01 10:00:00", "2024-01-01 10:01:00"],
+        "location": ["28.1,-16.1", "28.2,-16.2", "bad", "28.3,-16.3"],
+        "precision": [5, None, 3, None],
+    })
+    track = prepare_track(data)
+    assert track["data"]["location"].tolist() == ["28.3,-16.3", "28.1,-16.1"]
+    assert track["times"][1] - track["times"][0] == 60
+    assert track["precision"].tolist() == [0, 5]
+
+    # Sin exigir hora válida, la fijación sin hora se conserva al final
+    assert prepare_track(data, require_time=False)["data"]["location"].tolist()[-1] == "28.2,-16.2"
+
+
+def all_pairs(times1, times2, max_time_gap, block_size):
+    blocks = list(candidate_pairs(times1, times2, max_time_gap, block_size))
+    assert all(len(first) <= block_size for first, _ in blocks)
+    return [(int(i), int(j)) for first, second in blocks for i, j in zip(first, second)]
+
+
+@pytest.mark.parametrize("max_time_gap", [None, 0, 30])
+def test_candidate_pairs_blocks_match_brute_force(max_time_gap):
+    times1 = np.array([0.0, 45.0, np.nan, 100.0, 10.0])
+    times2 = np.array([0.0, 20.0, 50.0, 60.0, 130.0, np.nan])
+    expected = [
+        (i, j) for i in range(len(times1)) for j in range(len(times2))
+        if max_time_gap is None or abs(times1[i] - times2[j]) <= max_time_gap
+    ]
+    for block_size in (1, 2, 7, 1 << 20):
+        assert all_pairs(times1, times2, max_time_gap, block_size) == expected